@@ -1,13 +1,12 @@
 # Importing the necessary modules from the chromadb package:
 # chromadb is used to interact with the Chroma DB database,
-# embedding_functions is used to define the embedding model
+# get_embedding_function returns the shared embedding model from embedding_registry
 import chromadb
-from chromadb.utils import embedding_functions
+from embedding_registry import get_embedding_function
 
 # Define the embedding function using SentenceTransformers
-ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2"
-)
+# The shared registry instance is reused by every collection in this process
+ef = get_embedding_function("all-MiniLM-L6-v2")
 
 # Create a new instance of ChromaClient to interact with the Chroma DB
 client = chromadb.Client()
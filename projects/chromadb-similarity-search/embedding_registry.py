@@ -0,0 +1,27 @@
+# Process-wide registry of embedding functions.
+# Loading a SentenceTransformer model is slow and each copy holds the full
+# model weights in memory, so every script and collection in this project
+# shares one instance per (model name, device) instead of building its own.
+
+import threading
+from chromadb.utils import embedding_functions
+
+# Default embedding model and device used by the examples
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_DEVICE = "cpu"
+
+# Loaded embedding functions keyed by (model name, device)
+_embedding_functions = {}
+_registry_lock = threading.Lock()
+
+def get_embedding_function(model_name=DEFAULT_MODEL_NAME, device=DEFAULT_DEVICE):
+    """Return the shared SentenceTransformer embedding function for a model and device"""
+    key = (model_name, device)
+    # Hold the lock while loading so concurrent callers never load the model twice
+    with _registry_lock:
+        if key not in _embedding_functions:
+            _embedding_functions[key] = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=model_name,
+                device=device
+            )
+        return _embedding_functions[key]
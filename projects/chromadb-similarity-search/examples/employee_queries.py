@@ -1,14 +1,18 @@
 # Example Employee Queries for ChromaDB Similarity Search
 # This file demonstrates various query patterns for the employee collection
 
+import os
+import sys
 import chromadb
-from chromadb.utils import embedding_functions
+
+# Make the project root importable so the examples share its embedding registry
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from embedding_registry import get_embedding_function
 
 def setup_employee_collection():
     """Setup the employee collection with sample data"""
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
+    # Reuse the process-wide model instead of loading it again on every setup call
+    ef = get_embedding_function("all-MiniLM-L6-v2")
     
     client = chromadb.Client()
     collection = client.create_collection(
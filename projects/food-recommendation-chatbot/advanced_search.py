@@ -7,16 +7,13 @@ def main():
         print("=" * 50)
         print("Loading food database with advanced filtering capabilities...")
         
-        # Load food data from JSON file
-        food_items = load_food_data('./FoodDataSet.json')
-        print(f"✅ Loaded {len(food_items)} food items successfully")
-        
-        # Create collection specifically for advanced search operations
-        collection = create_similarity_search_collection(
+        # Load food data and build the advanced search collection in parallel
+        collection, food_items, _ = start_food_search(
+            './FoodDataSet.json',
             "advanced_food_search",
             {'description': 'A collection for advanced search demos'}
         )
-        populate_similarity_collection(collection, food_items)
+        print(f"✅ Loaded {len(food_items)} food items successfully")
         
         # Start the interactive advanced search interface
         interactive_advanced_search(collection)
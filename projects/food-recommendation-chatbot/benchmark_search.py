@@ -0,0 +1,194 @@
+from shared_functions import *
+import argparse
+import json
+import platform
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+DEFAULT_WORKLOAD_FILE = './benchmark_queries.json'
+DEFAULT_WARMUP = 5
+DEFAULT_REPETITIONS = 50
+
+def load_query_workload(file_path: str) -> List[Dict]:
+    """Load benchmark queries; entries are strings or dicts with query and optional filters"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        entries = json.load(file)
+
+    workload = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'query': entry}
+        workload.append({
+            'query': entry['query'],
+            'cuisine_filter': entry.get('cuisine_filter'),
+            'max_calories': entry.get('max_calories')
+        })
+    return workload
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+def summarize_latencies(latencies: List[float], total_time: float) -> Dict:
+    """Summarize per-call latencies (seconds) into milliseconds and QPS"""
+    ordered = sorted(latencies)
+    return {
+        'calls': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000 if ordered else 0.0,
+        'qps': len(ordered) / total_time if total_time > 0 else 0.0
+    }
+
+def reset_query_caches():
+    """Clear query caches so a call pays for embedding and index lookup"""
+    query_embedding_memo.clear()
+    query_result_cache.clear()
+
+def benchmark_function(search_fn: Callable[[Dict], object], workload: List[Dict],
+                       warmup: int = DEFAULT_WARMUP, repetitions: int = DEFAULT_REPETITIONS,
+                       cold: bool = True) -> Dict:
+    """Time search_fn over the workload after a warmup phase
+
+    Every repetition runs each workload entry once. With cold=True the query
+    caches are cleared (outside the timed region) before each call.
+    """
+    for i in range(warmup):
+        search_fn(workload[i % len(workload)])
+
+    latencies = []
+    timed_total = 0.0
+    for _ in range(repetitions):
+        for entry in workload:
+            if cold:
+                reset_query_caches()
+            start = time.perf_counter()
+            search_fn(entry)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            timed_total += elapsed
+
+    return summarize_latencies(latencies, timed_total)
+
+def template_rag_response(query: str, results: List[Dict]) -> str:
+    """Build a RAG-style answer from search results without calling an LLM"""
+    if not results:
+        return f"I couldn't find any food items matching '{query}'."
+
+    top_result = results[0]
+    response = f"I'd highly recommend the {top_result['food_name']} - it's a {top_result['similarity_score']*100:.0f}% match. "
+    response += f"It's a {top_result['cuisine_type']} dish with {top_result['food_calories_per_serving']} calories per serving."
+    if len(results) > 1:
+        response += f" You might also enjoy {results[1]['food_name']} as an alternative."
+    return response
+
+def build_search_approaches(collection, n_results: int = 3, with_llm: bool = False) -> Dict[str, Callable]:
+    """Return the search paths to benchmark, keyed by name"""
+    def similarity(entry):
+        return perform_similarity_search(collection, entry['query'], n_results)
+
+    def filtered(entry):
+        return perform_filtered_similarity_search(
+            collection, entry['query'],
+            cuisine_filter=entry['cuisine_filter'],
+            max_calories=entry['max_calories'],
+            n_results=n_results,
+            use_cache=False
+        )
+
+    def hybrid(entry):
+        return perform_hybrid_search(collection, entry['query'], n_results)
+
+    if with_llm:
+        # Imported lazily: the chatbot module needs watsonx.ai credentials
+        from enhanced_rag_chatbot import generate_llm_rag_response
+
+        def rag(entry):
+            results = perform_similarity_search(collection, entry['query'], n_results)
+            return generate_llm_rag_response(entry['query'], results)
+    else:
+        def rag(entry):
+            results = perform_similarity_search(collection, entry['query'], n_results)
+            return template_rag_response(entry['query'], results)
+
+    return {
+        'perform_similarity_search': similarity,
+        'perform_filtered_similarity_search': filtered,
+        'perform_hybrid_search': hybrid,
+        'rag': rag
+    }
+
+def run_benchmarks(collection, workload: List[Dict], warmup: int = DEFAULT_WARMUP,
+                   repetitions: int = DEFAULT_REPETITIONS, n_results: int = 3,
+                   with_llm: bool = False, cold: bool = True) -> Dict:
+    """Benchmark every search approach and return a JSON-serializable report"""
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'collection_size': collection.count(),
+        'workload_size': len(workload),
+        'warmup': warmup,
+        'repetitions': repetitions,
+        'n_results': n_results,
+        'cache_mode': 'cold' if cold else 'warm',
+        'with_llm': with_llm,
+        'results': {}
+    }
+
+    for name, search_fn in build_search_approaches(collection, n_results, with_llm).items():
+        report['results'][name] = benchmark_function(search_fn, workload, warmup, repetitions, cold)
+
+    return report
+
+def print_benchmark_report(report: Dict):
+    """Print a latency table for a benchmark report"""
+    print(f"\n📊 BENCHMARK RESULTS ({report['repetitions']} reps x {report['workload_size']} queries, "
+          f"{report['cache_mode']} caches)")
+    print("=" * 78)
+    print(f"{'Approach':<36} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'QPS':>11}")
+    print("-" * 78)
+    for name, stats in report['results'].items():
+        print(f"{name:<36} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['qps']:>11.1f}")
+    print("=" * 78)
+
+def main():
+    """Benchmark the food search paths over a query workload"""
+    parser = argparse.ArgumentParser(description="Benchmark food search latency and throughput")
+    parser.add_argument('--data', default='./FoodDataSet.json', help="Food dataset to index")
+    parser.add_argument('--workload', default=DEFAULT_WORKLOAD_FILE, help="JSON file of benchmark queries")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="Untimed warmup calls per approach")
+    parser.add_argument('--repetitions', type=int, default=DEFAULT_REPETITIONS, help="Timed passes over the workload")
+    parser.add_argument('--n-results', type=int, default=3, help="Results requested per query")
+    parser.add_argument('--warm-cache', action='store_true', help="Keep query caches between calls")
+    parser.add_argument('--with-llm', action='store_true', help="Call watsonx.ai in the RAG path")
+    parser.add_argument('--backend', default=VECTOR_BACKEND, choices=['auto', 'chroma', 'numpy', 'faiss'],
+                        help="Vector backend to benchmark")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    food_items = load_food_data(args.data)
+    collection = create_similarity_search_collection("benchmark_food_search", backend=args.backend,
+                                                     expected_size=len(food_items))
+    populate_similarity_collection(collection, food_items)
+    workload = load_query_workload(args.workload)
+
+    report = run_benchmarks(collection, workload, args.warmup, args.repetitions,
+                            args.n_results, args.with_llm, cold=not args.warm_cache)
+    print_benchmark_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import re
+import numpy as np
+from typing import Callable, Dict, List, Sequence
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of document embeddings.
+
+    Vectors live in a flat float32 file that is memory-mapped on read, and a
+    keys file holds the hash of each document text on the line matching its
+    row, so new batches are appended to both files instead of rewriting an
+    index. A small index file records the model and dimension; the cache is
+    scoped to one embedding model, so (model name, text hash) is the key.
+    """
+
+    MATRIX_FILE = "embeddings.f32"
+    KEYS_FILE = "keys.txt"
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.model_name = model_name
+        safe_model_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.directory = os.path.join(cache_dir, safe_model_name)
+        self.matrix_path = os.path.join(self.directory, self.MATRIX_FILE)
+        self.keys_path = os.path.join(self.directory, self.KEYS_FILE)
+        self.index_path = os.path.join(self.directory, self.INDEX_FILE)
+        self.dimension = None
+        self.rows: Dict[str, int] = {}
+        self._stored_rows = 0
+        self._matrix = None
+        self._load_index()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """Hash document text into a cache key"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _load_index(self):
+        """Load the row keys, discarding them if they belong to another model"""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable embedding cache index: {e}")
+            return
+
+        if index.get('model_name') != self.model_name or not index.get('dimension'):
+            return
+        self.dimension = index['dimension']
+
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'r', encoding='utf-8') as file:
+                keys = file.read().split('\n')
+        # The last entry is empty after a complete write, or a partial key after an interrupted one
+        keys = keys[:-1]
+
+        # Keep only rows present in both files; an interrupted append leaves one longer
+        if os.path.exists(self.matrix_path):
+            keys = keys[:os.path.getsize(self.matrix_path) // (self.dimension * 4)]
+        else:
+            keys = []
+        self.rows = {key: row for row, key in enumerate(keys)}
+        self._stored_rows = len(keys)
+        self._repair_files(keys)
+        if 'rows' in index:
+            # Index written by an older version, which kept every row in it
+            self._save_index()
+
+    def _repair_files(self, keys: List[str]):
+        """Trim the matrix and keys files back to the rows they have in common"""
+        row_bytes = self.dimension * 4
+        if os.path.exists(self.matrix_path) and os.path.getsize(self.matrix_path) != len(keys) * row_bytes:
+            with open(self.matrix_path, 'r+b') as file:
+                file.truncate(len(keys) * row_bytes)
+        expected_size = sum(len(key) + 1 for key in keys)
+        if os.path.exists(self.keys_path) and os.path.getsize(self.keys_path) != expected_size:
+            with open(self.keys_path, 'w', encoding='utf-8') as file:
+                file.writelines(key + '\n' for key in keys)
+
+    def _save_index(self):
+        """Atomically write the model and dimension next to the matrix"""
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'model_name': self.model_name,
+                'dimension': self.dimension
+            }, file)
+        os.replace(temp_path, self.index_path)
+
+    def _open_matrix(self):
+        """Memory-map the stored embedding matrix read-only"""
+        if self._matrix is None and self.rows:
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r',
+                                     shape=(self._stored_rows, self.dimension))
+        return self._matrix
+
+    def _append(self, keys: List[str], vectors: np.ndarray):
+        """Append new vectors to the matrix and their keys to the keys file"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            # Start both files afresh for this model
+            for path in (self.matrix_path, self.keys_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._save_index()
+
+        # Matrix first: vectors written without their keys are trimmed on the next load
+        with open(self.matrix_path, 'ab') as file:
+            file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.keys_path, 'a', encoding='utf-8') as file:
+            file.writelines(key + '\n' for key in keys)
+
+        for offset, key in enumerate(keys):
+            self.rows[key] = self._stored_rows + offset
+        self._stored_rows += len(keys)
+        self._matrix = None
+
+    def get_embeddings(self, texts: Sequence[str],
+                       embed_fn: Callable[[List[str]], Sequence]) -> np.ndarray:
+        """Return embeddings for texts, calling embed_fn only for cache misses"""
+        keys = [self.text_key(text) for text in texts]
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.rows and key not in missing:
+                missing[key] = text
+
+        if missing:
+            new_vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            self._append(list(missing.keys()), new_vectors)
+
+        if not keys:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+
+        matrix = self._open_matrix()
+        return np.asarray(matrix[[self.rows[key] for key in keys]], dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.rows)
@@ -1,9 +1,15 @@
 from shared_functions import *
-from typing import List, Dict, Any
-from ibm_watsonx_ai.foundation_models.utils.enums import ModelTypes
-from ibm_watsonx_ai.foundation_models import ModelInference
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+import argparse
+import asyncio
+import threading
 import json
 
+if TYPE_CHECKING:
+    from ibm_watsonx_ai.foundation_models import ModelInference
+    from semantic_cache import SemanticResponseCache
+
 # Global variables
 food_items = []
 
@@ -18,40 +24,100 @@ project_id = "skills-network"  # <--- NOTE: specify "skills-network" as your pro
 space_id = None
 verify = False
 
-# Initialize the LLM model
-model = ModelInference(
-    model_id=model_id,
-    credentials=my_credentials,
-    params=gen_parms,
-    project_id=project_id,
-    space_id=space_id,
-    verify=verify,
-)
+stream_responses = True  # Print LLM answers token by token as they arrive
+llm_concurrency = 4  # Maximum LLM requests in flight across all chat sessions
+semantic_cache_threshold = 0.92  # Cosine similarity needed to reuse a previous answer
+semantic_cache_size = 512
+min_response_length = 50  # Shorter LLM answers are replaced by the template response
+
+# Separate pool so slow LLM calls never starve vector searches
+llm_executor = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+
+# The LLM client (and the ibm_watsonx_ai import) is built on first use, not at import time
+_model = None
+_model_lock = threading.Lock()
+
+def get_llm_model() -> 'ModelInference':
+    """Return the shared ModelInference client, creating it on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from ibm_watsonx_ai.foundation_models import ModelInference
+                _model = ModelInference(
+                    model_id=model_id,
+                    credentials=my_credentials,
+                    params=gen_parms,
+                    project_id=project_id,
+                    space_id=space_id,
+                    verify=verify,
+                )
+    return _model
+
+def check_llm_health() -> bool:
+    """Cheap connectivity check: fetch the model details instead of generating text"""
+    try:
+        details = get_llm_model().get_details()
+        return bool(details)
+    except Exception as e:
+        print(f"❌ LLM health check failed: {e}")
+        return False
+
+def start_llm_warmup() -> Future:
+    """Build the LLM client and check its health on a background thread"""
+    return llm_executor.submit(check_llm_health)
+
+# Previous LLM answers, reused for near-identical queries over the same results
+_semantic_response_cache = None
+
+def get_semantic_response_cache() -> 'SemanticResponseCache':
+    """Return the semantic response cache, creating it on first use"""
+    global _semantic_response_cache
+    if _semantic_response_cache is None:
+        from semantic_cache import SemanticResponseCache
+        _semantic_response_cache = SemanticResponseCache(semantic_cache_threshold, semantic_cache_size)
+    return _semantic_response_cache
+
+def _invalidate_semantic_cache(collection_name: str):
+    """Drop cached answers for a collection that changed"""
+    if _semantic_response_cache is not None:
+        _semantic_response_cache.invalidate_collection(collection_name)
+
+on_collection_changed(_invalidate_semantic_cache)
 
 def main():
     """Main function for enhanced RAG chatbot system"""
+    parser = argparse.ArgumentParser(description="Enhanced RAG-powered food recommendation chatbot")
+    parser.add_argument('--health-check', action='store_true',
+                        help="Check the watsonx.ai connection and exit")
+    args = parser.parse_args()
+    
+    if args.health_check:
+        healthy = check_llm_health()
+        print("✅ LLM connection healthy" if healthy else "❌ LLM connection failed")
+        raise SystemExit(0 if healthy else 1)
+    
     try:
         print("🤖 Enhanced RAG-Powered Food Recommendation Chatbot")
         print("   Powered by IBM Granite & ChromaDB")
         print("=" * 55)
         
-        # Load food data
-        global food_items
-        food_items = load_food_data('./FoodDataSet.json')
-        print(f"✅ Loaded {len(food_items)} food items")
+        # Connect to the LLM in the background while the vector DB is built
+        llm_warmup = start_llm_warmup()
         
-        # Create collection for RAG system
-        collection = create_similarity_search_collection(
+        # Load food data, embedding model and RAG collection in parallel
+        global food_items
+        collection, food_items, _ = start_food_search(
+            './FoodDataSet.json',
             "enhanced_rag_food_chatbot",
             {'description': 'Enhanced RAG chatbot with IBM watsonx.ai integration'}
         )
-        populate_similarity_collection(collection, food_items)
+        print(f"✅ Loaded {len(food_items)} food items")
         print("✅ Vector database ready")
         
-        # Test LLM connection
+        # Wait for the background LLM warmup to finish
         print("🔗 Testing LLM connection...")
-        test_response = model.generate(prompt="Hello", params=None)
-        if test_response and "results" in test_response:
+        if llm_warmup.result():
             print("✅ LLM connection established")
         else:
             print("❌ LLM connection failed")
@@ -102,14 +168,13 @@ def prepare_context_for_llm(query: str, search_results: List[Dict]) -> str:
     
     return "\n".join(context_parts)
 
-def generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
-    """Generate response using IBM Granite with retrieved context"""
-    try:
-        # Prepare context from search results
-        context = prepare_context_for_llm(query, search_results)
-        
-        # Build the prompt for the LLM
-        prompt = f'''You are a helpful food recommendation assistant. A user is asking for food recommendations, and I've retrieved relevant options from a food database.
+def build_rag_prompt(query: str, search_results: List[Dict]) -> str:
+    """Build the RAG prompt for the LLM from the query and retrieved context"""
+    # Prepare context from search results
+    context = prepare_context_for_llm(query, search_results)
+    
+    # Build the prompt for the LLM
+    return f'''You are a helpful food recommendation assistant. A user is asking for food recommendations, and I've retrieved relevant options from a food database.
 
 User Query: "{query}"
 
@@ -126,8 +191,13 @@ Please provide a helpful, short response that:
 
 Response:'''
 
+def generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
+    """Generate response using IBM Granite with retrieved context"""
+    try:
+        prompt = build_rag_prompt(query, search_results)
+
         # Generate response using IBM Granite
-        generated_response = model.generate(prompt=prompt, params=None)
+        generated_response = get_llm_model().generate(prompt=prompt, params=None)
         
         # Extract the generated text
         if generated_response and "results" in generated_response:
@@ -137,7 +207,7 @@ Response:'''
             response_text = response_text.strip()
             
             # If response is too short, provide a fallback
-            if len(response_text) < 50:
+            if len(response_text) < min_response_length:
                 return generate_fallback_response(query, search_results)
             
             return response_text
@@ -148,6 +218,44 @@ Response:'''
         print(f"❌ LLM Error: {e}")
         return generate_fallback_response(query, search_results)
 
+class LLMStreamInterrupted(Exception):
+    """The LLM stream failed after part of the answer had been yielded"""
+
+def generate_llm_rag_response_stream(query: str, search_results: List[Dict]) -> Iterator[str]:
+    """Stream the IBM Granite response chunk by chunk as it is generated
+
+    The first min_response_length characters are buffered so that, like the
+    blocking path, a failed, empty or too short answer is replaced by the
+    template response instead of being shown. Raises LLMStreamInterrupted
+    when the stream fails after the answer started, so the partial text is
+    never treated as a complete answer.
+    """
+    buffered = []
+    streamed_any = False
+    try:
+        prompt = build_rag_prompt(query, search_results)
+        
+        for chunk in get_llm_model().generate_text_stream(prompt=prompt, params=None):
+            if not chunk:
+                continue
+            if streamed_any:
+                yield chunk
+                continue
+            # Hold the answer back until it is long enough to be kept
+            buffered.append(chunk)
+            text = "".join(buffered).lstrip()
+            if len(text.strip()) >= min_response_length:
+                streamed_any = True
+                yield text
+            
+    except Exception as e:
+        if streamed_any:
+            raise LLMStreamInterrupted(str(e)) from e
+        print(f"❌ LLM Error: {e}")
+    
+    if not streamed_any:
+        yield generate_fallback_response(query, search_results)
+
 def generate_fallback_response(query: str, search_results: List[Dict]) -> str:
     """Generate fallback response when LLM fails"""
     if not search_results:
@@ -194,6 +302,9 @@ def enhanced_rag_food_chatbot(collection):
                 continue
             
             if user_input.lower() in ['quit', 'exit', 'q']:
+                cache_stats = get_semantic_response_cache().stats()
+                if cache_stats['hits'] + cache_stats['misses']:
+                    print(f"\n⚡ Semantic cache: {cache_stats['hits']} hits, {cache_stats['hit_rate']*100:.0f}% hit rate")
                 print("\n🤖 Bot: Thank you for using the Enhanced RAG Food Chatbot!")
                 print("      Hope you found some delicious recommendations! 👋")
                 break
@@ -219,8 +330,45 @@ def enhanced_rag_food_chatbot(collection):
         except Exception as e:
             print(f"❌ Bot: Sorry, I encountered an error: {e}")
 
-def handle_enhanced_rag_query(collection, query: str, conversation_history: List[str]):
+def _semantic_cache_key(collection, query: str, search_results: List[Dict]):
+    """Return (query embedding, food IDs, collection key) for the semantic cache"""
+    query_embeddings = embed_queries(collection, [query])
+    if not query_embeddings:
+        return None
+    food_ids = [result['food_id'] for result in search_results]
+    return query_embeddings[0], food_ids, (collection.name, get_collection_version(collection))
+
+def lookup_cached_response(collection, query: str, search_results: List[Dict]):
+    """Return a stored LLM answer for a near-identical query, or None"""
+    cache_key = _semantic_cache_key(collection, query, search_results)
+    if cache_key is None:
+        return None
+    return get_semantic_response_cache().lookup(*cache_key)
+
+def store_cached_response(collection, query: str, search_results: List[Dict], response: str):
+    """Remember an LLM answer; template fallbacks and short answers are not cached"""
+    if len(response) < min_response_length or response == generate_fallback_response(query, search_results):
+        return
+    cache_key = _semantic_cache_key(collection, query, search_results)
+    if cache_key is not None:
+        get_semantic_response_cache().store(*cache_key, response)
+
+def show_search_results_details(search_results: List[Dict]):
+    """Show the retrieved items behind the chatbot answer"""
+    print(f"\n📊 Search Results Details:")
+    print("-" * 45)
+    for i, result in enumerate(search_results[:3], 1):
+        print(f"{i}. 🍽️  {result['food_name']}")
+        print(f"   📍 {result['cuisine_type']} | 🔥 {result['food_calories_per_serving']} cal | 📈 {result['similarity_score']*100:.1f}% match")
+        if i < 3:
+            print()
+
+def handle_enhanced_rag_query(collection, query: str, conversation_history: List[str],
+                              stream: bool = None):
     """Handle user query with enhanced RAG approach using IBM Granite"""
+    if stream is None:
+        stream = stream_responses
+    
     print(f"\n🔍 Searching vector database for: '{query}'...")
     
     # Perform similarity search with more results for better context
@@ -232,21 +380,90 @@ def handle_enhanced_rag_query(collection, query: str, conversation_history: List
         return
     
     print(f"✅ Found {len(search_results)} relevant matches")
+    
+    # Reuse the answer to a near-identical earlier question over the same dishes
+    cached_response = lookup_cached_response(collection, query, search_results)
+    if cached_response is not None:
+        print("⚡ Answering from semantic cache")
+        print(f"\n🤖 Bot: {cached_response}")
+        show_search_results_details(search_results)
+        return
+    
+    if stream:
+        # Show retrieved items right away, then render the answer as it streams in
+        show_search_results_details(search_results)
+        print("\n🧠 Generating AI-powered response...")
+        print("\n🤖 Bot: ", end="", flush=True)
+        chunks = []
+        try:
+            for chunk in generate_llm_rag_response_stream(query, search_results):
+                chunks.append(chunk)
+                print(chunk, end="", flush=True)
+        except LLMStreamInterrupted as e:
+            # Keep the partial answer on screen but out of the semantic cache
+            print(f"\n❌ LLM stream interrupted: {e}")
+            return
+        print()
+        store_cached_response(collection, query, search_results, "".join(chunks).strip())
+        return
+    
     print("🧠 Generating AI-powered response...")
     
     # Generate enhanced RAG response using IBM Granite
     ai_response = generate_llm_rag_response(query, search_results)
+    store_cached_response(collection, query, search_results, ai_response)
     
     print(f"\n🤖 Bot: {ai_response}")
     
     # Show detailed results for reference
-    print(f"\n📊 Search Results Details:")
-    print("-" * 45)
-    for i, result in enumerate(search_results[:3], 1):
-        print(f"{i}. 🍽️  {result['food_name']}")
-        print(f"   📍 {result['cuisine_type']} | 🔥 {result['food_calories_per_serving']} cal | 📈 {result['similarity_score']*100:.1f}% match")
-        if i < 3:
-            print()
+    show_search_results_details(search_results)
+
+async def async_generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
+    """Async variant of generate_llm_rag_response, run on the LLM thread pool"""
+    return await run_blocking(generate_llm_rag_response, query, search_results, executor=llm_executor)
+
+async def async_generate_llm_comparison(query1: str, query2: str, results1: List[Dict],
+                                        results2: List[Dict]) -> str:
+    """Async variant of generate_llm_comparison, run on the LLM thread pool"""
+    return await run_blocking(generate_llm_comparison, query1, query2, results1, results2,
+                              executor=llm_executor)
+
+async def async_handle_rag_query(collection, query: str) -> Dict[str, Any]:
+    """Retrieve and answer one query without blocking the event loop"""
+    search_results = await async_perform_similarity_search(collection, query, 3)
+    if not search_results:
+        response = generate_fallback_response(query, search_results)
+    else:
+        response = lookup_cached_response(collection, query, search_results)
+        if response is None:
+            response = await async_generate_llm_rag_response(query, search_results)
+            store_cached_response(collection, query, search_results, response)
+    return {'query': query, 'search_results': search_results, 'response': response}
+
+async def async_compare_queries(collection, query1: str, query2: str):
+    """Run both comparison retrievals concurrently, then generate the comparison"""
+    results1, results2 = await asyncio.gather(
+        async_perform_similarity_search(collection, query1, 3),
+        async_perform_similarity_search(collection, query2, 3)
+    )
+    comparison_response = await async_generate_llm_comparison(query1, query2, results1, results2)
+    return results1, results2, comparison_response
+
+async def serve_chat_sessions(collection, sessions: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
+    """Serve many chat sessions concurrently in one process
+
+    Each session's queries are answered in order, while different sessions
+    interleave their retrievals and LLM calls. Returns the answers per session.
+    """
+    async def run_session(queries: List[str]) -> List[Dict]:
+        answers = []
+        for query in queries:
+            answers.append(await async_handle_rag_query(collection, query))
+        return answers
+
+    session_ids = list(sessions)
+    transcripts = await asyncio.gather(*(run_session(sessions[session_id]) for session_id in session_ids))
+    return dict(zip(session_ids, transcripts))
 
 def handle_enhanced_comparison_mode(collection):
     """Enhanced comparison between two food queries using LLM"""
@@ -263,12 +480,8 @@ def handle_enhanced_comparison_mode(collection):
     
     print(f"\n🔍 Analyzing '{query1}' vs '{query2}' with AI...")
     
-    # Get results for both queries
-    results1 = perform_similarity_search(collection, query1, 3)
-    results2 = perform_similarity_search(collection, query2, 3)
-    
-    # Generate AI-powered comparison
-    comparison_response = generate_llm_comparison(query1, query2, results1, results2)
+    # Get results for both queries concurrently, then generate AI-powered comparison
+    results1, results2, comparison_response = asyncio.run(async_compare_queries(collection, query1, query2))
     
     print(f"\n🤖 AI Analysis: {comparison_response}")
     
@@ -309,7 +522,7 @@ Please provide a short comparison that:
 
 Comparison:'''
 
-        generated_response = model.generate(prompt=comparison_prompt, params=None)
+        generated_response = get_llm_model().generate(prompt=comparison_prompt, params=None)
         
         if generated_response and "results" in generated_response:
             return generated_response["results"][0]["generated_text"].strip()
@@ -0,0 +1,122 @@
+import argparse
+import json
+import random
+from typing import Dict, Iterator
+
+# Cuisine mix, weighted roughly like a large restaurant catalog
+CUISINE_WEIGHTS = {
+    "Italian": 16, "American": 15, "Mexican": 11, "Chinese": 10, "Indian": 9,
+    "Japanese": 8, "Thai": 7, "Mediterranean": 6, "French": 5, "Korean": 4,
+    "Vietnamese": 3, "Greek": 3, "Middle Eastern": 3
+}
+
+# Dish types with (median calories, spread) used for a log-normal calorie draw
+DISH_TYPES = {
+    "Salad": (280, 0.30), "Soup": (250, 0.30), "Curry": (520, 0.25), "Noodles": (560, 0.25),
+    "Pasta": (620, 0.25), "Pizza": (780, 0.25), "Burger": (720, 0.20), "Tacos": (450, 0.25),
+    "Rice Bowl": (540, 0.25), "Stir-Fry": (480, 0.25), "Grilled Fish": (380, 0.25),
+    "Roast Chicken": (520, 0.20), "Sandwich": (480, 0.25), "Stew": (500, 0.25),
+    "Cake": (430, 0.25), "Pie": (360, 0.25), "Pastry": (340, 0.30), "Smoothie Bowl": (310, 0.30)
+}
+
+ADJECTIVES = ["Classic", "Spicy", "Creamy", "Smoky", "Herbed", "Crispy", "Zesty", "Rustic",
+              "Golden", "Garlic", "Honey", "Lemon", "Sesame", "Tangy", "Hearty", "Fresh"]
+
+INGREDIENTS = {
+    "base": ["Rice", "Noodles", "Flour", "Pasta", "Potatoes", "Quinoa", "Bread", "Tortillas", "Lentils"],
+    "protein": ["Chicken", "Beef", "Pork", "Shrimp", "Salmon", "Tofu", "Eggs", "Chickpeas", "Lamb", "Paneer"],
+    "vegetable": ["Tomatoes", "Onions", "Garlic", "Spinach", "Bell Peppers", "Mushrooms", "Carrots",
+                  "Zucchini", "Broccoli", "Cucumber", "Eggplant", "Cabbage", "Corn", "Avocado"],
+    "flavor": ["Basil", "Cilantro", "Ginger", "Chili", "Cumin", "Soy Sauce", "Lemon Juice", "Olive Oil",
+               "Coconut Milk", "Parmesan", "Cinnamon", "Cocoa Powder", "Vanilla Extract", "Butter", "Sugar"]
+}
+
+COOKING_METHODS = ["Baking", "Grilling", "Stir-frying", "Simmering", "Roasting", "Steaming",
+                   "Frying", "Braising", "Raw", "Sauteing"]
+
+FEATURES = {
+    "taste": ["sweet", "savory", "spicy", "tangy", "umami", "mild", "rich", "smoky"],
+    "texture": ["crispy", "creamy", "tender", "crunchy", "chewy", "silky", "flaky", "hearty"],
+    "appearance": ["golden brown", "vibrant", "colorful", "glossy", "rustic", "layered"],
+    "preparation": ["baked", "grilled", "fried", "simmered", "roasted", "steamed", "tossed"],
+    "serving_type": ["hot", "cold", "warm", "room temperature"]
+}
+
+HEALTH_BENEFITS = [
+    "High in protein and essential amino acids", "Rich in fiber and vitamins",
+    "Good source of healthy fats", "Provides quick energy from carbohydrates",
+    "Rich in antioxidants", "Contains probiotics and minerals", "Low in saturated fat"
+]
+
+def generate_food_records(count: int, seed: int = 42, start_id: int = 1) -> Iterator[Dict]:
+    """Yield count deterministic synthetic food items in the FoodDataSet.json schema"""
+    rng = random.Random(seed)
+    cuisines = list(CUISINE_WEIGHTS)
+    cuisine_weights = list(CUISINE_WEIGHTS.values())
+    dish_types = list(DISH_TYPES)
+
+    for offset in range(count):
+        cuisine = rng.choices(cuisines, cuisine_weights)[0]
+        dish_type = rng.choice(dish_types)
+        adjective = rng.choice(ADJECTIVES)
+        median_calories, spread = DISH_TYPES[dish_type]
+        calories = int(min(1500, max(60, rng.lognormvariate(0, spread) * median_calories)))
+
+        ingredients = [rng.choice(INGREDIENTS["base"]), rng.choice(INGREDIENTS["protein"])]
+        ingredients += rng.sample(INGREDIENTS["vegetable"], rng.randint(1, 4))
+        ingredients += rng.sample(INGREDIENTS["flavor"], rng.randint(1, 3))
+
+        # Split calories into macros (4 kcal/g carbs and protein, 9 kcal/g fat)
+        carb_share = rng.uniform(0.35, 0.6)
+        protein_share = rng.uniform(0.1, 0.35)
+        fat_share = max(0.05, 1 - carb_share - protein_share)
+        method = rng.choice(COOKING_METHODS)
+
+        yield {
+            "food_id": start_id + offset,
+            "food_name": f"{adjective} {cuisine} {dish_type}",
+            "food_description": f"A {adjective.lower()} {cuisine} {dish_type.lower()} made with "
+                                f"{ingredients[1].lower()}, {ingredients[2].lower()} and {ingredients[-1].lower()}.",
+            "food_calories_per_serving": calories,
+            "food_nutritional_factors": {
+                "carbohydrates": f"{round(calories * carb_share / 4)}g",
+                "protein": f"{round(calories * protein_share / 4)}g",
+                "fat": f"{round(calories * fat_share / 9)}g"
+            },
+            "food_ingredients": ingredients,
+            "food_health_benefits": rng.choice(HEALTH_BENEFITS),
+            "cooking_method": method,
+            "cuisine_type": cuisine,
+            "food_features": {key: rng.choice(values) for key, values in FEATURES.items()}
+        }
+
+def write_synthetic_catalog(file_path: str, count: int, seed: int = 42) -> int:
+    """Stream a synthetic catalog to a JSON Lines (.jsonl) or JSON array file"""
+    as_json_lines = file_path.endswith(('.jsonl', '.ndjson'))
+    written = 0
+    with open(file_path, 'w', encoding='utf-8') as file:
+        if not as_json_lines:
+            file.write('[\n')
+        for record in generate_food_records(count, seed):
+            if as_json_lines:
+                file.write(json.dumps(record) + '\n')
+            else:
+                file.write((',\n' if written else '') + json.dumps(record))
+            written += 1
+        if not as_json_lines:
+            file.write('\n]\n')
+    return written
+
+def main():
+    """Generate a synthetic food catalog file"""
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic food catalog")
+    parser.add_argument('--count', type=int, default=10000, help="Number of food records (e.g. 10000 to 10000000)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed; the same seed gives the same catalog")
+    parser.add_argument('--output', default='./synthetic_food_catalog.jsonl', help="Output .jsonl or .json file")
+    args = parser.parse_args()
+
+    written = write_synthetic_catalog(args.output, args.count, args.seed)
+    print(f"✅ Wrote {written} synthetic food items to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,14 @@ def main():
         print("=" * 50)
         print("Loading food database...")
         
-        # Load food data from file
+        # Load food data, embedding model and search collection in parallel
         global food_items
-        food_items = load_food_data('./FoodDataSet.json')
-        print(f"✅ Loaded {len(food_items)} food items successfully")
-        
-        # Create and populate search collection
-        collection = create_similarity_search_collection(
+        collection, food_items, _ = start_food_search(
+            './FoodDataSet.json',
             "interactive_food_search",
             {'description': 'A collection for interactive food search'}
         )
-        populate_similarity_collection(collection, food_items)
+        print(f"✅ Loaded {len(food_items)} food items successfully")
         
         # Start interactive chatbot
         interactive_food_chatbot(collection)
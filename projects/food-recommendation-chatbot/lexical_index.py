@@ -0,0 +1,127 @@
+import math
+import re
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words too common in food documents to help ranking
+STOPWORDS = frozenset(["a", "an", "and", "the", "with", "of", "in", "for", "to", "or", "on", "is", "it"])
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over collection documents.
+
+    Postings are appended as documents are upserted; deleted documents are
+    masked out and their postings dropped once they outnumber live ones.
+    Each term's postings are turned into NumPy arrays on first use after a
+    write, so a query is a handful of vectorized adds over short arrays.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._row_of: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._term_counts: List[Optional[Counter]] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._document_frequency: Counter = Counter()
+        self._posting_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._length_array = np.zeros(0, dtype=np.float32)
+        self._live_array = np.zeros(0, dtype=bool)
+        self._arrays_stale = False
+        self._live = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _add(self, doc_id: str, term_counts: Counter):
+        row = len(self._ids)
+        self._row_of[doc_id] = row
+        self._ids.append(doc_id)
+        self._term_counts.append(term_counts)
+        length = sum(term_counts.values())
+        self._lengths.append(length)
+        for term, count in term_counts.items():
+            rows, counts = self._postings.setdefault(term, ([], []))
+            rows.append(row)
+            counts.append(count)
+            self._document_frequency[term] += 1
+            self._posting_arrays.pop(term, None)
+        self._live += 1
+        self._total_length += length
+
+    def _remove(self, doc_id: str):
+        row = self._row_of.pop(doc_id, None)
+        if row is None:
+            return
+        for term in self._term_counts[row]:
+            self._document_frequency[term] -= 1
+        self._live -= 1
+        self._total_length -= self._lengths[row]
+        self._ids[row] = None
+        self._term_counts[row] = None
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str]):
+        """Index documents, replacing any earlier version of the same ids"""
+        for doc_id, document in zip(ids, documents):
+            self._remove(str(doc_id))
+            self._add(str(doc_id), Counter(tokenize(document)))
+        self._arrays_stale = True
+
+    def delete(self, ids: Sequence[str]):
+        """Remove documents from the index"""
+        for doc_id in ids:
+            self._remove(str(doc_id))
+        if len(self._ids) - self._live > self._live:
+            self._compact()
+        self._arrays_stale = True
+
+    def _compact(self):
+        """Rebuild postings from live documents only"""
+        live = [(doc_id, counts) for doc_id, counts in zip(self._ids, self._term_counts) if doc_id is not None]
+        self.__init__(self.k1, self.b)
+        for doc_id, counts in live:
+            self._add(doc_id, counts)
+
+    def _refresh_arrays(self):
+        if self._arrays_stale:
+            self._length_array = np.asarray(self._lengths, dtype=np.float32)
+            self._live_array = np.asarray([doc_id is not None for doc_id in self._ids], dtype=bool)
+            self._arrays_stale = False
+
+    def _term_postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        if term not in self._posting_arrays:
+            rows, counts = self._postings[term]
+            self._posting_arrays[term] = (np.asarray(rows, dtype=np.int64), np.asarray(counts, dtype=np.float32))
+        return self._posting_arrays[term]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to k (doc_id, score) pairs ranked by BM25"""
+        terms = [term for term in set(tokenize(query)) if self._document_frequency.get(term, 0) > 0]
+        if not terms or not self._live:
+            return []
+        self._refresh_arrays()
+
+        average_length = self._total_length / self._live
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        for term in terms:
+            frequency = self._document_frequency[term]
+            idf = math.log(1.0 + (self._live - frequency + 0.5) / (frequency + 0.5))
+            rows, counts = self._term_postings(term)
+            norm = self.k1 * (1.0 - self.b + self.b * self._length_array[rows] / average_length)
+            scores[rows] += idf * counts * (self.k1 + 1.0) / (counts + norm)
+        scores[~self._live_array] = 0.0
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched])]
+        return [(self._ids[row], float(scores[row])) for row in matched]
@@ -0,0 +1,199 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+
+# Fields indexed by default: food metadata as written by build_food_metadata
+DEFAULT_CATEGORICAL_FIELDS = ('cuisine_type', 'cooking_method')
+DEFAULT_NUMERIC_FIELDS = ('calories',)
+
+
+class ColumnarMetadataStore:
+    """Column-oriented copy of selected metadata fields for vectorized filtering.
+
+    Categorical fields are dictionary-encoded into an int32 code array with
+    one boolean bitmap per distinct value, so equality and $in filters are
+    bitmap lookups and ORs. Numeric fields are kept as a float64 column plus
+    a lazily re-sorted copy, so range filters are two binary searches.
+    mask() returns None for clauses on fields it does not index; callers then
+    fall back to evaluating the metadata dicts.
+    """
+
+    def __init__(self, categorical_fields: Sequence[str] = DEFAULT_CATEGORICAL_FIELDS,
+                 numeric_fields: Sequence[str] = DEFAULT_NUMERIC_FIELDS):
+        self.categorical_fields = tuple(categorical_fields)
+        self.numeric_fields = tuple(numeric_fields)
+        self._count = 0
+        self._capacity = 0
+        self._codes = {field: np.zeros(0, dtype=np.int32) for field in self.categorical_fields}
+        self._dictionaries: Dict[str, Dict[Any, int]] = {field: {} for field in self.categorical_fields}
+        self._bitmaps: Dict[str, List[np.ndarray]] = {field: [] for field in self.categorical_fields}
+        self._numbers = {field: np.zeros(0, dtype=np.float64) for field in self.numeric_fields}
+        self._sorted: Dict[str, Optional[tuple]] = {field: None for field in self.numeric_fields}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self, rows_needed: int):
+        if rows_needed <= self._capacity:
+            return
+        capacity = max(rows_needed, self._capacity * 2, 1024)
+
+        def grown(array, fill):
+            result = np.full(capacity, fill, dtype=array.dtype)
+            result[:len(array)] = array
+            return result
+
+        for field in self.categorical_fields:
+            self._codes[field] = grown(self._codes[field], -1)
+            self._bitmaps[field] = [grown(bitmap, False) for bitmap in self._bitmaps[field]]
+        for field in self.numeric_fields:
+            self._numbers[field] = grown(self._numbers[field], np.nan)
+        self._capacity = capacity
+
+    def _code_for(self, field: str, value: Any) -> int:
+        dictionary = self._dictionaries[field]
+        if value not in dictionary:
+            dictionary[value] = len(dictionary)
+            self._bitmaps[field].append(np.zeros(self._capacity, dtype=bool))
+        return dictionary[value]
+
+    def set_rows(self, rows: Sequence[int], metadatas: Sequence[Optional[Dict]]):
+        """Write the indexed fields of each metadata dict at its row"""
+        if len(rows) == 0:
+            return
+        self._grow(int(max(rows)) + 1)
+        for row, metadata in zip(rows, metadatas):
+            metadata = metadata or {}
+            for field in self.categorical_fields:
+                old_code = self._codes[field][row]
+                if old_code >= 0:
+                    self._bitmaps[field][old_code][row] = False
+                value = metadata.get(field)
+                code = self._code_for(field, value) if value is not None else -1
+                self._codes[field][row] = code
+                if code >= 0:
+                    self._bitmaps[field][code][row] = True
+            for field in self.numeric_fields:
+                value = metadata.get(field)
+                self._numbers[field][row] = value if isinstance(value, (int, float)) else np.nan
+        self._count = max(self._count, int(max(rows)) + 1)
+        self._invalidate_sorted()
+
+    def move_row(self, source: int, target: int):
+        """Copy one row over another (used when deletes compact storage)"""
+        for field in self.categorical_fields:
+            codes = self._codes[field]
+            if codes[target] >= 0:
+                self._bitmaps[field][codes[target]][target] = False
+            codes[target] = codes[source]
+            if codes[target] >= 0:
+                self._bitmaps[field][codes[target]][target] = True
+        for field in self.numeric_fields:
+            self._numbers[field][target] = self._numbers[field][source]
+        self._invalidate_sorted()
+
+    def truncate(self, count: int):
+        """Drop every row at or after count"""
+        for field in self.categorical_fields:
+            for code in np.unique(self._codes[field][count:self._count]):
+                if code >= 0:
+                    self._bitmaps[field][code][count:self._count] = False
+            self._codes[field][count:self._count] = -1
+        for field in self.numeric_fields:
+            self._numbers[field][count:self._count] = np.nan
+        self._count = count
+        self._invalidate_sorted()
+
+    def _invalidate_sorted(self):
+        for field in self.numeric_fields:
+            self._sorted[field] = None
+
+    def _sorted_column(self, field: str):
+        """Return (sorted values, their rows) for a numeric field, rebuilding after writes"""
+        if self._sorted[field] is None:
+            values = self._numbers[field][:self._count]
+            present = np.flatnonzero(~np.isnan(values))
+            order = present[np.argsort(values[present], kind='stable')]
+            self._sorted[field] = (values[order], order)
+        return self._sorted[field]
+
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """Number of rows holding each value of a categorical field"""
+        return {value: int(self._bitmaps[field][code][:self._count].sum())
+                for value, code in self._dictionaries[field].items()}
+
+    def numeric_column(self, field: str) -> np.ndarray:
+        """Values of a numeric field in row order (NaN where missing)"""
+        return self._numbers[field][:self._count]
+
+    def _range_mask(self, field: str, lower=None, upper=None,
+                    include_lower: bool = True, include_upper: bool = True) -> np.ndarray:
+        values, rows = self._sorted_column(field)
+        start = 0 if lower is None else np.searchsorted(values, lower, side='left' if include_lower else 'right')
+        end = len(values) if upper is None else np.searchsorted(values, upper, side='right' if include_upper else 'left')
+        mask = np.zeros(self._count, dtype=bool)
+        mask[rows[start:end]] = True
+        return mask
+
+    def _categorical_mask(self, field: str, values: Sequence[Any]) -> np.ndarray:
+        mask = np.zeros(self._count, dtype=bool)
+        for value in values:
+            code = self._dictionaries[field].get(value)
+            if code is not None:
+                mask |= self._bitmaps[field][code][:self._count]
+        return mask
+
+    def _field_mask(self, field: str, condition: Any) -> Optional[np.ndarray]:
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        mask = np.ones(self._count, dtype=bool)
+
+        if field in self._dictionaries:
+            for operator, operand in condition.items():
+                if operator in ('$eq', '$in'):
+                    mask &= self._categorical_mask(field, operand if operator == '$in' else [operand])
+                elif operator in ('$ne', '$nin'):
+                    mask &= ~self._categorical_mask(field, operand if operator == '$nin' else [operand])
+                else:
+                    return None
+            return mask
+
+        if field in self._numbers:
+            for operator, operand in condition.items():
+                if operator == '$eq':
+                    mask &= self._range_mask(field, operand, operand)
+                elif operator == '$ne':
+                    mask &= ~self._range_mask(field, operand, operand)
+                elif operator in ('$gt', '$gte'):
+                    mask &= self._range_mask(field, lower=operand, include_lower=operator == '$gte')
+                elif operator in ('$lt', '$lte'):
+                    mask &= self._range_mask(field, upper=operand, include_upper=operator == '$lte')
+                elif operator in ('$in', '$nin'):
+                    matched = np.isin(self._numbers[field][:self._count], list(operand))
+                    mask &= matched if operator == '$in' else ~matched
+                else:
+                    return None
+            return mask
+
+        return None
+
+    def mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Boolean row mask for a Chroma-style where clause, or None if not indexable"""
+        if not where:
+            return np.ones(self._count, dtype=bool)
+        if '$and' in where or '$or' in where:
+            combine_and = '$and' in where
+            result = np.ones(self._count, dtype=bool) if combine_and else np.zeros(self._count, dtype=bool)
+            for clause in where['$and' if combine_and else '$or']:
+                clause_mask = self.mask(clause)
+                if clause_mask is None:
+                    return None
+                result = result & clause_mask if combine_and else result | clause_mask
+            return result
+
+        result = np.ones(self._count, dtype=bool)
+        for field, condition in where.items():
+            field_mask = self._field_mask(field, condition)
+            if field_mask is None:
+                return None
+            result &= field_mask
+        return result
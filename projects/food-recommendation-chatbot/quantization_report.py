@@ -0,0 +1,125 @@
+from shared_functions import *
+from benchmark_search import DEFAULT_WORKLOAD_FILE, load_query_workload
+from generate_synthetic_catalog import generate_food_records
+from vector_index import QuantizedVectorIndex, normalize_rows, top_k_rows
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+# Queries used by the employee examples in the chromadb-similarity-search project
+EMPLOYEE_QUERIES = [
+    "Python developer with web development experience",
+    "Python programming development",
+    "cloud architecture DevOps infrastructure automation",
+    "leadership team management mentoring",
+    "marketing analytics customer analytics campaign optimization",
+    "senior Python developer full-stack",
+    "strategic HR organizational development change management",
+    "team leader manager with experience"
+]
+
+EMPLOYEE_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chromadb-similarity-search")
+
+def load_employee_documents() -> List[str]:
+    """Return the employee documents built by the chromadb-similarity-search examples"""
+    sys.path.insert(0, os.path.join(EMPLOYEE_PROJECT_DIR, "examples"))
+    from employee_queries import setup_employee_collection
+    return setup_employee_collection().get(include=["documents"])["documents"]
+
+def embed_texts(texts: List[str]):
+    """Embed texts with the shared model, through the embedding cache when enabled"""
+    embedding_function = get_embedding_function()
+    embedding_cache = get_embedding_cache()
+    if embedding_cache is not None:
+        return embedding_cache.get_embeddings(texts, embedding_function)
+    return embedding_function(texts)
+
+def measure_recall(documents: List[str], queries: List[str], k: int, storage: str,
+                   rescore_factor: int, document_embeddings, query_embeddings) -> Dict:
+    """Recall@k of a quantized index against exact float32 search, plus its memory use"""
+    exact_vectors = normalize_rows(document_embeddings)
+    query_vectors = normalize_rows(query_embeddings)
+    k = min(k, len(documents))
+    exact_rows, _ = top_k_rows(query_vectors @ exact_vectors.T, k)
+
+    index = QuantizedVectorIndex(f"recall_{storage}", storage=storage, rescore_factor=rescore_factor)
+    index.add(ids=[str(i) for i in range(len(documents))], documents=documents, embeddings=exact_vectors)
+    results = index.query(query_embeddings=query_vectors, n_results=k)
+
+    hits = sum(
+        len(set(int(doc_id) for doc_id in result_ids) & set(expected.tolist()))
+        for result_ids, expected in zip(results['ids'], exact_rows)
+    )
+    float32_bytes = exact_vectors.nbytes
+    return {
+        'storage': storage,
+        'rescore_factor': rescore_factor,
+        'recall_at_k': hits / (k * len(queries)),
+        'vector_bytes': index.memory_bytes(),
+        'float32_bytes': float32_bytes,
+        'compression': float32_bytes / index.memory_bytes() if index.memory_bytes() else 0.0
+    }
+
+def build_report(datasets: Dict[str, Dict], k: int, rescore_factors: List[int]) -> List[Dict]:
+    """Measure every storage mode and rescore factor on every dataset"""
+    report = []
+    for name, dataset in datasets.items():
+        print(f"\n📦 {name}: {len(dataset['documents'])} documents, {len(dataset['queries'])} queries")
+        document_embeddings = embed_texts(dataset['documents'])
+        query_embeddings = embed_texts(dataset['queries'])
+        for storage in ('float16', 'int8'):
+            for rescore_factor in rescore_factors:
+                result = measure_recall(dataset['documents'], dataset['queries'], k, storage,
+                                        rescore_factor, document_embeddings, query_embeddings)
+                result['dataset'] = name
+                result['documents'] = len(dataset['documents'])
+                report.append(result)
+    return report
+
+def print_quantization_report(report: List[Dict], k: int):
+    """Print recall@k against vector memory for each configuration"""
+    print(f"\n📊 RECALL@{k} VS MEMORY (baseline: exact float32)")
+    print("=" * 78)
+    print(f"{'Dataset':<22} {'Storage':<8} {'Rescore':>7} {'Recall':>8} {'Vectors':>12} {'float32':>12} {'Ratio':>6}")
+    for result in report:
+        print(f"{result['dataset']:<22} {result['storage']:<8} {result['rescore_factor']:>6}x "
+              f"{result['recall_at_k']:>8.3f} {result['vector_bytes'] / 1024:>10.1f}KB "
+              f"{result['float32_bytes'] / 1024:>10.1f}KB {result['compression']:>5.1f}x")
+    print("\nRescore 1x ranks by the compact vectors alone; higher factors rescore more candidates in float32.")
+
+def main():
+    """Compare int8 and float16 vector storage with exact float32 search"""
+    parser = argparse.ArgumentParser(description="Recall@k vs. memory report for quantized vector storage")
+    parser.add_argument('--data', default='./FoodDataSet.json', help="Food dataset file")
+    parser.add_argument('--workload', default=DEFAULT_WORKLOAD_FILE, help="JSON file of food queries")
+    parser.add_argument('--synthetic', type=int, default=10000,
+                        help="Also measure a synthetic food catalog of this size (0 to skip)")
+    parser.add_argument('--k', type=int, default=5, help="Number of neighbours compared")
+    parser.add_argument('--rescore-factors', type=int, nargs='+', default=[1, RESCORE_FACTOR],
+                        help="Candidates rescored in float32 per result")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    food_queries = [entry['query'] for entry in load_query_workload(args.workload)]
+    _, food_documents, _ = prepare_food_records(load_food_data(args.data))
+    datasets = {
+        'food': {'documents': food_documents, 'queries': food_queries},
+        'employees': {'documents': load_employee_documents(), 'queries': EMPLOYEE_QUERIES}
+    }
+    if args.synthetic:
+        synthetic_items = [normalize_food_item(item, i) for i, item in enumerate(generate_food_records(args.synthetic))]
+        _, synthetic_documents, _ = prepare_food_records(synthetic_items)
+        datasets[f'synthetic food ({args.synthetic})'] = {'documents': synthetic_documents, 'queries': food_queries}
+
+    report = build_report(datasets, args.k, args.rescore_factors)
+    print_quantization_report(report, args.k)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'k': args.k, 'results': report}, file, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class QueryResultCache:
+    """LRU cache of search results with a TTL and entry/byte bounds.
+
+    Keys are expected to start with the collection name, so every entry for a
+    collection can be dropped when that collection changes.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _estimate_size(results: List[Dict]) -> int:
+        """Approximate the memory held by a result list"""
+        return len(json.dumps(results, default=str))
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def get(self, key: Hashable) -> Optional[List[Dict]]:
+        """Return a copy of the cached results, or None on a miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            results, expires_at, _ = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(result) for result in results]
+
+    def put(self, key: Hashable, results: List[Dict]):
+        """Store results, evicting least recently used entries past the bounds"""
+        size = self._estimate_size(results)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = ([dict(result) for result in results], expires_at, size)
+            self._total_bytes += size
+
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_collection(self, collection_name: str):
+        """Drop every entry cached for the named collection"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == collection_name]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class QueryEmbeddingMemo:
+    """Bounded LRU memo of query text to embedding vector, per model."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, model_name: str, texts: List[str], embed_fn) -> List[Any]:
+        """Return one vector per text, calling embed_fn once for all unseen texts"""
+        vectors = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (model_name, text)
+                vector = self._vectors.get(key)
+                if vector is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._vectors.move_to_end(key)
+                    vectors[i] = vector
+            self.hits += len(texts) - sum(len(positions) for positions in missing.values())
+            self.misses += sum(len(positions) for positions in missing.values())
+
+        if missing:
+            new_vectors = embed_fn(list(missing.keys()))
+            with self._lock:
+                for (text, positions), vector in zip(missing.items(), new_vectors):
+                    self._vectors[(model_name, text)] = vector
+                    for i in positions:
+                        vectors[i] = vector
+                while len(self._vectors) > self.max_entries:
+                    self._vectors.popitem(last=False)
+
+        return vectors
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
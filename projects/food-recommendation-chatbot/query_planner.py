@@ -0,0 +1,140 @@
+import logging
+import numpy as np
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from metadata_index import ColumnarMetadataStore
+
+logger = logging.getLogger("food_search.planner")
+
+# Filters expected to match at most this many items are answered by an exact
+# scan of the matching subset
+BRUTE_FORCE_MAX_MATCHES = 2000
+
+# Oversampling applied on top of 1 / selectivity for ANN + post-filter plans
+OVERSAMPLE_SAFETY = 2.0
+MAX_OVERSAMPLED_K = 1000
+
+# Width of the calorie histogram buckets
+CALORIE_BUCKET_WIDTH = 50
+
+# Categorical metadata fields with exact value counts
+COUNTED_FIELDS = ('cuisine_type', 'cooking_method')
+
+# Assumed selectivity of clauses without statistics (other fields, document text)
+DEFAULT_CLAUSE_SELECTIVITY = 0.5
+
+
+class MetadataStatistics:
+    """Cuisine and cooking method counts and a calorie histogram used to estimate filter selectivity"""
+
+    def __init__(self, total: int, value_counts: Dict[str, Dict[Any, int]], calories: np.ndarray):
+        self.total = total
+        self.value_counts = value_counts
+        calories = np.asarray(calories, dtype=np.float64)
+        top = (calories.max() if len(calories) else 0) + CALORIE_BUCKET_WIDTH
+        self.calorie_edges = np.arange(0, top + CALORIE_BUCKET_WIDTH, CALORIE_BUCKET_WIDTH, dtype=np.float64)
+        counts, _ = np.histogram(calories, bins=self.calorie_edges)
+        self.calorie_cumulative = np.concatenate(([0], np.cumsum(counts)))
+
+    @classmethod
+    def from_metadatas(cls, metadatas: List[Optional[Dict]]) -> 'MetadataStatistics':
+        """Count values by scanning every metadata dict (Chroma collections)"""
+        value_counts: Dict[str, Dict[Any, int]] = {field: {} for field in COUNTED_FIELDS}
+        calories = []
+        for metadata in metadatas:
+            metadata = metadata or {}
+            for field, counts in value_counts.items():
+                value = metadata.get(field)
+                counts[value] = counts.get(value, 0) + 1
+            value = metadata.get('calories')
+            if isinstance(value, (int, float)):
+                calories.append(value)
+        return cls(len(metadatas), value_counts, np.asarray(calories))
+
+    @classmethod
+    def from_columns(cls, columns: 'ColumnarMetadataStore') -> 'MetadataStatistics':
+        """Read counts from the bitmaps and calorie column of an in-process index"""
+        value_counts = {field: columns.value_counts(field) if field in columns.categorical_fields else {}
+                        for field in COUNTED_FIELDS}
+        if 'calories' in columns.numeric_fields:
+            calories = columns.numeric_column('calories')
+            calories = calories[~np.isnan(calories)]
+        else:
+            calories = np.zeros(0)
+        return cls(len(columns), value_counts, calories)
+
+    def _calories_at_most(self, value: float) -> float:
+        """Estimated number of items with calories <= value (linear within a bucket)"""
+        return float(np.interp(value, self.calorie_edges, self.calorie_cumulative))
+
+    def _calorie_selectivity(self, condition: Dict) -> float:
+        lower, upper = 0.0, float(self.calorie_edges[-1])
+        for operator, operand in condition.items():
+            if operator in ('$lt', '$lte'):
+                upper = min(upper, operand)
+            elif operator in ('$gt', '$gte'):
+                lower = max(lower, operand)
+            elif operator == '$eq':
+                lower, upper = operand, operand + 1
+            else:
+                return 1.0
+        matching = self._calories_at_most(upper) - self._calories_at_most(lower)
+        return max(matching, 0.0) / self.total if self.total else 0.0
+
+    def estimate_selectivity(self, where: Optional[Dict]) -> float:
+        """Estimated fraction of items matching a where clause (independence assumed)"""
+        if not where or not self.total:
+            return 1.0
+        if '$and' in where:
+            return float(np.prod([self.estimate_selectivity(clause) for clause in where['$and']]))
+        if '$or' in where:
+            return 1.0 - float(np.prod([1.0 - self.estimate_selectivity(clause) for clause in where['$or']]))
+
+        selectivity = 1.0
+        for field, condition in where.items():
+            if not isinstance(condition, dict):
+                condition = {'$eq': condition}
+            if field in self.value_counts and set(condition) <= {'$eq', '$in'}:
+                values = condition.get('$in', [condition.get('$eq')])
+                counts = self.value_counts[field]
+                selectivity *= sum(counts.get(value, 0) for value in values) / self.total
+            elif field == 'calories':
+                selectivity *= self._calorie_selectivity(condition)
+            else:
+                selectivity *= DEFAULT_CLAUSE_SELECTIVITY
+        return selectivity
+
+
+def plan_filtered_query(statistics: MetadataStatistics, where: Optional[Dict], n_results: int,
+                        where_document: Optional[Dict] = None, filtered_index: bool = False) -> Dict[str, Any]:
+    """Choose how to run a filtered vector query
+
+    filtered_index says the ANN index applies the filter during search
+    (FAISS ID selectors); exhaustive indexes never reach the planner.
+
+    Strategies:
+    - "index_filter": push the filter into the ANN search, or no filter at all
+    - "prefilter_exact": fetch the matching subset and rank it exactly
+    - "postfilter_ann": ANN search for an oversampled k, then filter
+    """
+    selectivity = statistics.estimate_selectivity(where)
+    if where_document:
+        selectivity *= DEFAULT_CLAUSE_SELECTIVITY
+    estimated_matches = selectivity * statistics.total
+    plan = {'selectivity': selectivity, 'estimated_matches': estimated_matches, 'k': n_results}
+
+    if not (where or where_document):
+        plan['strategy'] = 'index_filter'
+    elif estimated_matches <= BRUTE_FORCE_MAX_MATCHES:
+        plan['strategy'] = 'prefilter_exact'
+    elif filtered_index:
+        plan['strategy'] = 'index_filter'
+    else:
+        plan['strategy'] = 'postfilter_ann'
+        oversampled = int(np.ceil(n_results / max(selectivity, 1e-9) * OVERSAMPLE_SAFETY))
+        plan['k'] = min(max(oversampled, n_results), MAX_OVERSAMPLED_K, statistics.total)
+
+    logger.info("Filtered query plan: %s (selectivity %.4f, ~%d matches, k=%d)",
+                plan['strategy'], selectivity, estimated_matches, plan['k'])
+    return plan
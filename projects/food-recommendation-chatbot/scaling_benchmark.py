@@ -0,0 +1,128 @@
+import shared_functions
+from shared_functions import *
+from benchmark_search import DEFAULT_WORKLOAD_FILE, benchmark_function, build_search_approaches, load_query_workload
+from generate_synthetic_catalog import write_synthetic_catalog
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+DEFAULT_SIZES = [10000, 30000, 100000]
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of all files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def measure_corpus_size(size: int, workload: List[Dict], work_dir: str, seed: int = 42,
+                        repetitions: int = 5) -> Dict:
+    """Generate, ingest and query a synthetic catalog of the given size"""
+    catalog_path = os.path.join(work_dir, f"catalog_{size}.jsonl")
+    index_dir = os.path.join(work_dir, f"index_{size}")
+    write_synthetic_catalog(catalog_path, size, seed)
+
+    collection = create_similarity_search_collection(f"scaling_{size}", persist_directory=index_dir,
+                                                    expected_size=size)
+    ingest_start = time.perf_counter()
+    ingested = ingest_food_items(collection, iter_food_data(catalog_path), show_progress=False)
+    ingest_time = time.perf_counter() - ingest_start
+
+    approaches = build_search_approaches(collection, n_results=5)
+    latency = {
+        name: benchmark_function(approaches[name], workload, warmup=3, repetitions=repetitions)
+        for name in ('perform_similarity_search', 'perform_filtered_similarity_search')
+    }
+
+    return {
+        'corpus_size': ingested,
+        'ingest_seconds': ingest_time,
+        'ingest_docs_per_sec': ingested / ingest_time if ingest_time > 0 else 0.0,
+        'index_bytes': directory_size(index_dir),
+        'catalog_bytes': os.path.getsize(catalog_path),
+        'latency': latency
+    }
+
+def plot_scaling_results(results: List[Dict], file_path: str):
+    """Plot ingest time, index size and query latency against corpus size"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib is not installed, skipping plot")
+        return
+
+    sizes = [result['corpus_size'] for result in results]
+    figure, axes = plt.subplots(1, 3, figsize=(15, 4))
+
+    axes[0].plot(sizes, [result['ingest_seconds'] for result in results], marker='o')
+    axes[0].set_title('Ingest time')
+    axes[0].set_ylabel('seconds')
+
+    axes[1].plot(sizes, [result['index_bytes'] / (1024 * 1024) for result in results], marker='o')
+    axes[1].set_title('Index size')
+    axes[1].set_ylabel('MiB')
+
+    for name in results[0]['latency']:
+        axes[2].plot(sizes, [result['latency'][name]['p50_ms'] for result in results], marker='o', label=f"{name} p50")
+        axes[2].plot(sizes, [result['latency'][name]['p95_ms'] for result in results], marker='x',
+                     linestyle='--', label=f"{name} p95")
+    axes[2].set_title('Query latency')
+    axes[2].set_ylabel('ms')
+    axes[2].legend(fontsize='small')
+
+    for axis in axes:
+        axis.set_xscale('log')
+        axis.set_xlabel('corpus size (dishes)')
+        axis.grid(True, alpha=0.3)
+
+    figure.tight_layout()
+    figure.savefig(file_path)
+    print(f"📈 Plot written to {file_path}")
+
+def main():
+    """Measure how ingestion and search scale with catalog size"""
+    parser = argparse.ArgumentParser(description="Scaling benchmark on synthetic food catalogs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Corpus sizes to test")
+    parser.add_argument('--seed', type=int, default=42, help="Synthetic catalog seed")
+    parser.add_argument('--workload', default=DEFAULT_WORKLOAD_FILE, help="JSON file of benchmark queries")
+    parser.add_argument('--repetitions', type=int, default=5, help="Timed passes over the workload per size")
+    parser.add_argument('--use-embedding-cache', action='store_true',
+                        help="Keep the on-disk embedding cache enabled (off by default so ingest time includes embedding)")
+    parser.add_argument('--output', default='./scaling_results.json', help="JSON results file")
+    parser.add_argument('--plot', default='./scaling_results.png', help="Plot file (needs matplotlib)")
+    args = parser.parse_args()
+
+    if not args.use_embedding_cache:
+        shared_functions.EMBEDDING_CACHE_DIR = ""
+
+    workload = load_query_workload(args.workload)
+    work_dir = tempfile.mkdtemp(prefix="food_scaling_")
+    results = []
+    try:
+        for size in sorted(args.sizes):
+            print(f"\n📏 Corpus size: {size}")
+            result = measure_corpus_size(size, workload, work_dir, args.seed, args.repetitions)
+            results.append(result)
+            search = result['latency']['perform_similarity_search']
+            print(f"   Ingest: {result['ingest_seconds']:.1f}s ({result['ingest_docs_per_sec']:.0f} docs/sec)")
+            print(f"   Index size: {result['index_bytes'] / (1024 * 1024):.1f} MiB")
+            print(f"   Search p50/p95: {search['p50_ms']:.2f}ms / {search['p95_ms']:.2f}ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'seed': args.seed, 'results': results}, file, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if results:
+        plot_scaling_results(results, args.plot)
+
+if __name__ == "__main__":
+    main()
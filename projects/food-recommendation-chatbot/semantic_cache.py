@@ -0,0 +1,106 @@
+import threading
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+
+class SemanticResponseCache:
+    """Cache of LLM answers looked up by query-embedding similarity.
+
+    Previous query embeddings are kept L2-normalized in one preallocated
+    matrix, so a lookup is a single matrix-vector product over at most
+    max_entries rows, which beats a graph index at this size. An answer is
+    reused only when the new query is similar enough, the same food items
+    were retrieved and the collection has not changed since it was stored.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.92, max_entries: int = 512):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+        self._entries = [None] * max_entries
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._occupied = np.zeros(max_entries, dtype=bool)
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, query_embedding: Sequence[float], food_ids: Sequence[str],
+               collection_key: Any) -> Optional[str]:
+        """Return a stored answer for a similar query with the same retrieved items"""
+        query_vector = self._normalize(query_embedding)
+        retrieved = tuple(sorted(food_ids))
+
+        with self._lock:
+            if self._vectors is None or not self._occupied.any():
+                self.misses += 1
+                return None
+
+            similarities = self._vectors @ query_vector
+            similarities[~self._occupied] = -np.inf
+
+            # Best match first among slots above the threshold
+            for slot in np.argsort(-similarities):
+                if similarities[slot] < self.similarity_threshold:
+                    break
+                entry = self._entries[slot]
+                if entry['food_ids'] == retrieved and entry['collection_key'] == collection_key:
+                    self._clock += 1
+                    self._last_used[slot] = self._clock
+                    self.hits += 1
+                    return entry['response']
+
+            self.misses += 1
+            return None
+
+    def store(self, query_embedding: Sequence[float], food_ids: Sequence[str],
+              collection_key: Any, response: str):
+        """Store an answer, evicting the least recently used entry when full"""
+        query_vector = self._normalize(query_embedding)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, query_vector.shape[0]), dtype=np.float32)
+
+            free_slots = np.flatnonzero(~self._occupied)
+            slot = int(free_slots[0]) if len(free_slots) else int(np.argmin(self._last_used))
+
+            self._clock += 1
+            self._vectors[slot] = query_vector
+            self._entries[slot] = {
+                'food_ids': tuple(sorted(food_ids)),
+                'collection_key': collection_key,
+                'response': response
+            }
+            self._last_used[slot] = self._clock
+            self._occupied[slot] = True
+
+    def invalidate_collection(self, collection_name: str):
+        """Drop every answer generated from the named collection"""
+        with self._lock:
+            for slot in np.flatnonzero(self._occupied):
+                if self._entries[slot]['collection_key'][0] == collection_name:
+                    self._occupied[slot] = False
+                    self._entries[slot] = None
+
+    def clear(self):
+        with self._lock:
+            self._occupied[:] = False
+            self._entries = [None] * self.max_entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': int(self._occupied.sum()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -1,46 +1,286 @@
-import chromadb
-from chromadb.utils import embedding_functions
+import functools
+import hashlib
 import json
+import os
 import re
-import numpy as np
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+from query_cache import QueryEmbeddingMemo, QueryResultCache
 
-# Initialize ChromaDB client
-client = chromadb.Client()
+if TYPE_CHECKING:
+    from embedding_cache import EmbeddingCache
+    from lexical_index import BM25Index
+    from query_planner import MetadataStatistics
+
+# chromadb, its embedding functions and numpy are slow to import, so they are
+# loaded on first use through the accessors below. The in-memory ChromaDB
+# client is likewise created by get_chroma_client() when first needed.
+client = None
+
+def get_chromadb():
+    """Import and return the chromadb module on first use"""
+    import chromadb
+    return chromadb
+
+def get_embedding_functions():
+    """Import and return chromadb's embedding_functions module on first use"""
+    from chromadb.utils import embedding_functions
+    return embedding_functions
+
+# Directory for persistent ChromaDB storage (unset keeps the in-memory client)
+CHROMA_PERSIST_DIRECTORY = os.environ.get("FOOD_CHROMA_PERSIST_DIR")
+_persistent_clients = {}
+
+# Embedding model and device used by every food collection
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DEVICE = os.environ.get("FOOD_EMBEDDING_DEVICE", "cpu")
+
+# Loaded embedding functions keyed by (model name, device), shared by all collections
+_embedding_function_registry = {}
+_embedding_registry_lock = threading.Lock()
+
+# On-disk embedding cache location (set FOOD_EMBEDDING_CACHE_DIR to move it,
+# or to an empty string to disable caching)
+EMBEDDING_CACHE_DIR = os.environ.get("FOOD_EMBEDDING_CACHE_DIR", ".embedding_cache")
+
+# Number of documents embedded per model call during ingestion
+EMBEDDING_BATCH_SIZE = 256
+
+# Vector storage: "float32" keeps Chroma's HNSW index, "float16" or "int8"
+# holds compact vectors in process and rescores candidates in float32
+VECTOR_STORAGE = os.environ.get("FOOD_VECTOR_STORAGE", "float32")
+
+# Candidates rescored in float32 per requested result with compact storage
+RESCORE_FACTOR = 4
+
+# Vector backend: "chroma", "numpy" for exact in-process search, "faiss" for
+# an in-process FAISS index of FAISS_INDEX_TYPE ("flat", "ivfpq" or "hnsw"),
+# or "auto" to use numpy below EXACT_SEARCH_MAX_ITEMS items and chroma otherwise
+VECTOR_BACKEND = os.environ.get("FOOD_VECTOR_BACKEND", "auto")
+FAISS_INDEX_TYPE = os.environ.get("FOOD_FAISS_INDEX_TYPE", "hnsw")
+EXACT_SEARCH_MAX_ITEMS = 10000
+
+# Embedding function and client of each collection created here, keyed by collection name
+_collection_embedding_functions = {}
+_collection_clients = {}
+_embedding_cache = None
+
+# Search result cache bounds
+QUERY_CACHE_MAX_ENTRIES = 1024
+QUERY_CACHE_MAX_BYTES = 8 * 1024 * 1024
+QUERY_CACHE_TTL_SECONDS = 300
+
+query_result_cache = QueryResultCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL_SECONDS)
+
+# Query text -> embedding memo shared by every search function
+QUERY_EMBEDDING_MEMO_SIZE = 4096
+query_embedding_memo = QueryEmbeddingMemo(QUERY_EMBEDDING_MEMO_SIZE)
+
+# Worker threads used to run blocking searches from async code
+SEARCH_EXECUTOR_WORKERS = 8
+_search_executor = None
+
+# Bumped whenever a collection's contents change, keyed by collection name
+_collection_versions = {}
+_collection_change_listeners = []
+
+# Metadata statistics for the query planner, keyed by collection name -> (version, statistics)
+_collection_statistics = {}
+
+# BM25 index over each collection's documents, keyed by collection name
+_lexical_indexes = {}
+
+def get_collection_version(collection) -> int:
+    """Return the content version of a collection"""
+    return _collection_versions.get(collection.name, 0)
+
+def on_collection_changed(callback):
+    """Register callback(collection_name) to run whenever a collection changes"""
+    _collection_change_listeners.append(callback)
+
+def mark_collection_changed(collection_name: str):
+    """Bump a collection's version and drop its cached search results"""
+    _collection_versions[collection_name] = _collection_versions.get(collection_name, 0) + 1
+    query_result_cache.invalidate_collection(collection_name)
+    for callback in _collection_change_listeners:
+        callback(collection_name)
+
+def get_embedding_cache() -> Optional['EmbeddingCache']:
+    """Return the shared embedding cache, or None when caching is disabled"""
+    global _embedding_cache
+    if not EMBEDDING_CACHE_DIR:
+        return None
+    if _embedding_cache is None:
+        from embedding_cache import EmbeddingCache
+        _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL_NAME)
+    return _embedding_cache
+
+def get_embedding_function(model_name: str = EMBEDDING_MODEL_NAME, device: str = EMBEDDING_DEVICE):
+    """Return the process-wide embedding function for a model and device, loading it once"""
+    key = (model_name, device)
+    # Held while loading so concurrent startup threads never load the model twice
+    with _embedding_registry_lock:
+        if key not in _embedding_function_registry:
+            _embedding_function_registry[key] = get_embedding_functions().SentenceTransformerEmbeddingFunction(
+                model_name=model_name,
+                device=device
+            )
+        return _embedding_function_registry[key]
+
+def get_chroma_client(persist_directory: Optional[str] = None):
+    """Return the in-memory client, or a persistent client for the given directory"""
+    global client
+    if not persist_directory:
+        if client is None:
+            client = get_chromadb().Client()
+        return client
+    if persist_directory not in _persistent_clients:
+        _persistent_clients[persist_directory] = get_chromadb().PersistentClient(path=persist_directory)
+    return _persistent_clients[persist_directory]
+
+def compute_dataset_fingerprint(food_items: List[Dict]) -> str:
+    """Hash the food items and embedding model into a dataset fingerprint"""
+    digest = hashlib.sha256(EMBEDDING_MODEL_NAME.encode('utf-8'))
+    for food in food_items:
+        digest.update(json.dumps(food, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+# Characters read per chunk when streaming food data files
+JSON_STREAM_CHUNK_SIZE = 1 << 16
+
+def normalize_food_item(item: Dict, index: int) -> Dict:
+    """Fill in required fields and derive taste_profile for one food item"""
+    # Normalize food_id to string
+    if 'food_id' not in item:
+        item['food_id'] = str(index + 1)
+    else:
+        item['food_id'] = str(item['food_id'])
+    
+    # Ensure required fields exist
+    if 'food_ingredients' not in item:
+        item['food_ingredients'] = []
+    if 'food_description' not in item:
+        item['food_description'] = ''
+    if 'cuisine_type' not in item:
+        item['cuisine_type'] = 'Unknown'
+    if 'food_calories_per_serving' not in item:
+        item['food_calories_per_serving'] = 0
+    
+    # Extract taste features from nested food_features if available
+    if 'food_features' in item and isinstance(item['food_features'], dict):
+        taste_features = []
+        for key, value in item['food_features'].items():
+            if value:
+                taste_features.append(str(value))
+        item['taste_profile'] = ', '.join(taste_features)
+    else:
+        item['taste_profile'] = ''
+    
+    return item
+
+def _iter_json_array(file, chunk_size: int) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without reading it whole
+
+    Malformed input is rejected as json.load would reject it: elements must
+    be separated by exactly one comma and only whitespace may follow the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    # What comes next: "[" (start), a value or "]" (first), a value (value),
+    # "," or "]" (separator), or nothing but whitespace (end)
+    state = 'start'
+    eof = False
+    
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+        
+        if position < len(buffer):
+            char = buffer[position]
+            if state == 'start':
+                if char != '[':
+                    raise ValueError("Expected a JSON array of food items")
+                state = 'first'
+                position += 1
+                continue
+            if state == 'end':
+                raise ValueError("Unexpected data after the JSON array of food items")
+            if state == 'separator':
+                if char not in ',]':
+                    raise ValueError(f"Expected ',' or ']' between food items, found {char!r}")
+                state = 'value' if char == ',' else 'end'
+                position += 1
+                continue
+            if char == ']':
+                if state == 'value':
+                    raise ValueError("Trailing comma in the JSON array of food items")
+                state = 'end'
+                position += 1
+                continue
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                # A value is complete once a delimiter follows it: a number
+                # cut at the buffer edge ("1." of "1.5e3") decodes early
+                if eof or (end < len(buffer) and buffer[end] in ' \t\r\n,]'):
+                    yield element
+                    state = 'separator'
+                    position = end
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            if state not in ('start', 'end'):
+                raise ValueError("Unterminated JSON array")
+            return
+        
+        # Drop consumed text and read the next chunk
+        buffer = buffer[position:]
+        position = 0
+        chunk = file.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+def _iter_json_lines(file) -> Iterator[Any]:
+    """Yield one JSON value per non-empty line"""
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def iter_food_data(file_path: str, chunk_size: int = JSON_STREAM_CHUNK_SIZE) -> Iterator[Dict]:
+    """Stream normalized food items from a JSON array or JSON Lines file
+
+    Items are parsed and normalized one at a time, so the result can be passed
+    straight to ingest_food_items without holding the whole file in memory.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        if file_path.endswith(('.jsonl', '.ndjson')):
+            items = _iter_json_lines(file)
+        else:
+            # Sniff the first non-whitespace character to pick the format
+            first_char = ''
+            while True:
+                char = file.read(1)
+                if not char or not char.isspace():
+                    first_char = char
+                    break
+            file.seek(0)
+            items = _iter_json_array(file, chunk_size) if first_char == '[' else _iter_json_lines(file)
+        
+        for i, item in enumerate(items):
+            yield normalize_food_item(item, i)
 
 def load_food_data(file_path: str) -> List[Dict]:
     """Load food data from JSON file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            food_data = json.load(file)
-        
-        # Ensure each item has required fields and normalize the structure
-        for i, item in enumerate(food_data):
-            # Normalize food_id to string
-            if 'food_id' not in item:
-                item['food_id'] = str(i + 1)
-            else:
-                item['food_id'] = str(item['food_id'])
-            
-            # Ensure required fields exist
-            if 'food_ingredients' not in item:
-                item['food_ingredients'] = []
-            if 'food_description' not in item:
-                item['food_description'] = ''
-            if 'cuisine_type' not in item:
-                item['cuisine_type'] = 'Unknown'
-            if 'food_calories_per_serving' not in item:
-                item['food_calories_per_serving'] = 0
-            
-            # Extract taste features from nested food_features if available
-            if 'food_features' in item and isinstance(item['food_features'], dict):
-                taste_features = []
-                for key, value in item['food_features'].items():
-                    if value:
-                        taste_features.append(str(value))
-                item['taste_profile'] = ', '.join(taste_features)
-            else:
-                item['taste_profile'] = ''
+        food_data = list(iter_food_data(file_path))
         
         print(f"Successfully loaded {len(food_data)} food items from {file_path}")
         return food_data
@@ -49,173 +289,904 @@ def load_food_data(file_path: str) -> List[Dict]:
         print(f"Error loading food data: {e}")
         return []
 
-def create_similarity_search_collection(collection_name: str, collection_metadata: dict = None):
-    """Create ChromaDB collection with sentence transformer embeddings"""
-    try:
-        # Try to delete existing collection to start fresh
-        client.delete_collection(collection_name)
-    except:
-        pass
-    
-    # Create embedding function
-    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
+def create_similarity_search_collection(collection_name: str, collection_metadata: dict = None,
+                                        persist_directory: Optional[str] = CHROMA_PERSIST_DIRECTORY,
+                                        storage: str = VECTOR_STORAGE, backend: str = VECTOR_BACKEND,
+                                        index_type: str = FAISS_INDEX_TYPE, expected_size: Optional[int] = None):
+    """Create ChromaDB collection with sentence transformer embeddings
+
+    With a persist_directory the existing collection is opened instead of
+    rebuilt, and populate_similarity_collection skips unchanged datasets.
+    With storage "float16" or "int8" an in-process QuantizedVectorIndex is
+    returned instead, with backend "faiss" a FaissVectorIndex of index_type
+    and with backend "numpy" an ExactVectorIndex. All of them are used
+    through the same search functions.
+    """
+    backend = choose_vector_backend(backend, expected_size, storage, persist_directory)
+    if backend == "numpy":
+        if storage != "float32":
+            raise ValueError("storage applies to the chroma backend; the numpy backend stores float32 vectors")
+        return create_exact_collection(collection_name, collection_metadata)
+    if backend == "faiss":
+        if storage != "float32":
+            raise ValueError("storage applies to the chroma backend; use index_type 'ivfpq' for compressed FAISS storage")
+        return create_faiss_collection(collection_name, collection_metadata, index_type, expected_size)
+    if backend != "chroma":
+        raise ValueError(f"Unknown vector backend '{backend}', expected 'auto', 'chroma', 'numpy' or 'faiss'")
+    if storage != "float32":
+        if persist_directory:
+            raise ValueError(f"{storage} storage is kept in process and rebuilt on each start; "
+                             "unset persist_directory (FOOD_CHROMA_PERSIST_DIR) to use it")
+        return create_quantized_collection(collection_name, collection_metadata, storage)
+    
+    chroma_client = get_chroma_client(persist_directory)
+    
+    if not persist_directory:
+        try:
+            # Try to delete existing collection to start fresh
+            chroma_client.delete_collection(collection_name)
+        except:
+            pass
+    
+    # Reuse the shared embedding model instead of loading one per collection
+    sentence_transformer_ef = get_embedding_function()
+    _collection_embedding_functions[collection_name] = sentence_transformer_ef
+    _collection_clients[collection_name] = chroma_client
+    _lexical_indexes.pop(collection_name, None)
+    mark_collection_changed(collection_name)
+    
+    configuration = {
+        "hnsw": {"space": "cosine"},
+        "embedding_function": sentence_transformer_ef
+    }
+    
+    if persist_directory:
+        # Open the stored index, creating it on first run
+        return chroma_client.get_or_create_collection(
+            name=collection_name,
+            metadata=collection_metadata,
+            configuration=configuration
+        )
     
     # Create new collection
-    return client.create_collection(
+    return chroma_client.create_collection(
         name=collection_name,
         metadata=collection_metadata,
-        configuration={
-            "hnsw": {"space": "cosine"},
-            "embedding_function": sentence_transformer_ef
-        }
+        configuration=configuration
     )
 
-def populate_similarity_collection(collection, food_items: List[Dict]):
-    """Populate collection with food data and generate embeddings"""
-    documents = []
-    metadatas = []
-    ids = []
+def choose_vector_backend(backend: str, expected_size: Optional[int] = None, storage: str = "float32",
+                          persist_directory: Optional[str] = None) -> str:
+    """Resolve "auto" to numpy for small in-memory catalogs and chroma otherwise"""
+    if backend != "auto":
+        return backend
+    if (expected_size is not None and expected_size <= EXACT_SEARCH_MAX_ITEMS
+            and storage == "float32" and not persist_directory):
+        return "numpy"
+    return "chroma"
+
+def _create_in_process_collection(index_class, collection_name: str, collection_metadata: dict = None,
+                                  **index_options):
+    """Build an in-process index that uses the shared embedding model"""
+    sentence_transformer_ef = get_embedding_function()
+    _collection_embedding_functions[collection_name] = sentence_transformer_ef
+    _collection_clients.pop(collection_name, None)
+    _lexical_indexes.pop(collection_name, None)
+    mark_collection_changed(collection_name)
     
-    # Create unique IDs to avoid duplicates
+    return index_class(
+        collection_name,
+        metadata=collection_metadata,
+        embedding_function=sentence_transformer_ef,
+        **index_options
+    )
+
+def create_exact_collection(collection_name: str, collection_metadata: dict = None):
+    """Create an in-process collection searched exactly with NumPy"""
+    from vector_index import ExactVectorIndex
+    return _create_in_process_collection(ExactVectorIndex, collection_name, collection_metadata)
+
+def create_quantized_collection(collection_name: str, collection_metadata: dict = None,
+                                storage: str = "int8"):
+    """Create an in-process collection storing int8 or float16 vectors"""
+    from vector_index import QuantizedVectorIndex
+    return _create_in_process_collection(QuantizedVectorIndex, collection_name, collection_metadata,
+                                         storage=storage, rescore_factor=RESCORE_FACTOR)
+
+def create_faiss_collection(collection_name: str, collection_metadata: dict = None,
+                            index_type: str = "hnsw", expected_size: Optional[int] = None):
+    """Create an in-process collection backed by a FAISS index
+
+    expected_size sizes IVF-PQ lists and training for the full catalog.
+    """
+    from vector_index import FaissVectorIndex
+    return _create_in_process_collection(FaissVectorIndex, collection_name, collection_metadata,
+                                         index_type=index_type, expected_size=expected_size)
+
+def build_food_document(food: Dict) -> str:
+    """Build the text that gets embedded for a food item"""
+    # Create comprehensive text for embedding using rich JSON structure
+    text = f"Name: {food['food_name']}. "
+    text += f"Description: {food.get('food_description', '')}. "
+    text += f"Ingredients: {', '.join(food.get('food_ingredients', []))}. "
+    text += f"Cuisine: {food.get('cuisine_type', 'Unknown')}. "
+    text += f"Cooking method: {food.get('cooking_method', '')}. "
+    
+    # Add taste profile from food_features
+    taste_profile = food.get('taste_profile', '')
+    if taste_profile:
+        text += f"Taste and features: {taste_profile}. "
+    
+    # Add health benefits if available
+    health_benefits = food.get('food_health_benefits', '')
+    if health_benefits:
+        text += f"Health benefits: {health_benefits}. "
+    
+    # Add nutritional information
+    if 'food_nutritional_factors' in food:
+        nutrition = food['food_nutritional_factors']
+        if isinstance(nutrition, dict):
+            nutrition_text = ', '.join([f"{k}: {v}" for k, v in nutrition.items()])
+            text += f"Nutrition: {nutrition_text}."
+    
+    return text
+
+# Prefix of the per-ingredient boolean metadata flags used by ingredient filters
+INGREDIENT_FLAG_PREFIX = "ingredient_"
+
+def _singular(word: str) -> str:
+    """Fold simple English plurals ("eggs" -> "egg", "berries" -> "berry", "tomatoes" -> "tomato")"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('ches', 'shes', 'sses', 'xes', 'oes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+def ingredient_flags(ingredient: str) -> List[str]:
+    """Metadata keys flagging each word of an ingredient ("Feta Cheese" -> ingredient_feta, ingredient_cheese)"""
+    words = re.findall(r"[a-z0-9]+", ingredient.lower())
+    return sorted({INGREDIENT_FLAG_PREFIX + _singular(word) for word in words})
+
+def build_food_metadata(food: Dict) -> Dict:
+    """Build the metadata stored alongside a food item
+
+    Each word of each ingredient also gets a boolean ingredient_<word> flag
+    (lowercased, plurals folded), so ingredient filters match words of the
+    ingredient list instead of the document text.
+    """
+    metadata = {
+        "name": food["food_name"],
+        "cuisine_type": food.get("cuisine_type", "Unknown"),
+        "ingredients": ", ".join(food.get("food_ingredients", [])),
+        "calories": food.get("food_calories_per_serving", 0),
+        "description": food.get("food_description", ""),
+        "cooking_method": food.get("cooking_method", ""),
+        "health_benefits": food.get("food_health_benefits", ""),
+        "taste_profile": food.get("taste_profile", "")
+    }
+    for ingredient in food.get("food_ingredients", []):
+        for flag in ingredient_flags(ingredient):
+            metadata[flag] = True
+    return metadata
+
+def compute_food_content_hash(document: str, metadata: Dict) -> str:
+    """Hash the embedded text and metadata of a food item"""
+    payload = json.dumps({'document': document, 'metadata': metadata}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def iter_food_records(food_items: Iterable[Dict]) -> Iterator[Tuple[str, str, Dict]]:
+    """Yield (stable ID, document, metadata with content hash) for each food item
+
+    IDs are the food_id. A later item reusing a food_id with different content
+    gets a content-hash suffix instead of an order-dependent counter, and
+    exact duplicates are only yielded once.
+    """
     used_ids = set()
     
     for i, food in enumerate(food_items):
-        # Create comprehensive text for embedding using rich JSON structure
-        text = f"Name: {food['food_name']}. "
-        text += f"Description: {food.get('food_description', '')}. "
-        text += f"Ingredients: {', '.join(food.get('food_ingredients', []))}. "
-        text += f"Cuisine: {food.get('cuisine_type', 'Unknown')}. "
-        text += f"Cooking method: {food.get('cooking_method', '')}. "
-        
-        # Add taste profile from food_features
-        taste_profile = food.get('taste_profile', '')
-        if taste_profile:
-            text += f"Taste and features: {taste_profile}. "
-        
-        # Add health benefits if available
-        health_benefits = food.get('food_health_benefits', '')
-        if health_benefits:
-            text += f"Health benefits: {health_benefits}. "
-        
-        # Add nutritional information
-        if 'food_nutritional_factors' in food:
-            nutrition = food['food_nutritional_factors']
-            if isinstance(nutrition, dict):
-                nutrition_text = ', '.join([f"{k}: {v}" for k, v in nutrition.items()])
-                text += f"Nutrition: {nutrition_text}."
-        
-        # Generate unique ID to avoid duplicates
-        base_id = str(food.get('food_id', i))
-        unique_id = base_id
-        counter = 1
-        while unique_id in used_ids:
-            unique_id = f"{base_id}_{counter}"
-            counter += 1
-        used_ids.add(unique_id)
+        text = build_food_document(food)
+        metadata = build_food_metadata(food)
+        content_hash = compute_food_content_hash(text, metadata)
+        metadata['content_hash'] = content_hash
         
+        stable_id = str(food.get('food_id', i))
+        if stable_id in used_ids:
+            stable_id = f"{stable_id}_{content_hash[:12]}"
+            if stable_id in used_ids:
+                continue
+        used_ids.add(stable_id)
+        
+        yield stable_id, text, metadata
+
+def prepare_food_records(food_items: List[Dict]):
+    """Build stable IDs, documents and metadata (with content hashes) for food items"""
+    ids = []
+    documents = []
+    metadatas = []
+    
+    for stable_id, text, metadata in iter_food_records(food_items):
+        ids.append(stable_id)
         documents.append(text)
-        ids.append(unique_id)
-        metadatas.append({
-            "name": food["food_name"],
-            "cuisine_type": food.get("cuisine_type", "Unknown"),
-            "ingredients": ", ".join(food.get("food_ingredients", [])),
-            "calories": food.get("food_calories_per_serving", 0),
-            "description": food.get("food_description", ""),
-            "cooking_method": food.get("cooking_method", ""),
-            "health_benefits": food.get("food_health_benefits", ""),
-            "taste_profile": food.get("taste_profile", "")
-        })
-    
-    # Add all data to collection
-    collection.add(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids
-    )
+        metadatas.append(metadata)
     
-    print(f"Added {len(food_items)} food items to collection")
+    return ids, documents, metadatas
 
-def perform_similarity_search(collection, query: str, n_results: int = 5) -> List[Dict]:
-    """Perform similarity search and return formatted results"""
+def embed_food_documents(collection, documents: List[str], verbose: bool = True):
+    """Embed documents through the embedding cache, or return None to let Chroma embed"""
+    embedding_cache = get_embedding_cache()
+    embedding_function = _collection_embedding_functions.get(collection.name)
+    if embedding_cache is None or embedding_function is None or not documents:
+        return None
+    
+    # Serve unchanged documents from the embedding cache, embed only the rest
+    cached_before = len(embedding_cache)
+    embeddings = embedding_cache.get_embeddings(documents, embedding_function)
+    newly_embedded = len(embedding_cache) - cached_before
+    if verbose:
+        print(f"Embedding cache: {len(documents) - newly_embedded} cached, {newly_embedded} newly embedded")
+    return embeddings
+
+def get_lexical_index(collection) -> 'BM25Index':
+    """Return the collection's BM25 index, rebuilding it from stored documents if out of step"""
+    from lexical_index import BM25Index
+    lexical_index = _lexical_indexes.get(collection.name)
+    if lexical_index is None or len(lexical_index) != collection.count():
+        stored = collection.get(include=["documents"])
+        lexical_index = BM25Index()
+        lexical_index.upsert(stored['ids'], stored['documents'])
+        _lexical_indexes[collection.name] = lexical_index
+    return lexical_index
+
+def upsert_food_records(collection, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings=None):
+    """Write records to the collection and to its BM25 index
+
+    A BM25 index is started here only when these records are the whole
+    collection (a fresh load); otherwise get_lexical_index builds it from
+    the stored documents on first use.
+    """
+    collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+    if collection.name not in _lexical_indexes:
+        if collection.count() != len(set(ids)):
+            return
+        from lexical_index import BM25Index
+        _lexical_indexes[collection.name] = BM25Index()
+    _lexical_indexes[collection.name].upsert(ids, documents)
+
+def delete_food_records(collection, ids: List[str]):
+    """Delete records from the collection and from its BM25 index"""
+    collection.delete(ids=ids)
+    if collection.name in _lexical_indexes:
+        _lexical_indexes[collection.name].delete(ids)
+
+def get_max_write_batch_size(collection) -> Optional[int]:
+    """Return the largest batch the collection's client accepts in one write"""
+    chroma_client = _collection_clients.get(collection.name)
     try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
+        return chroma_client.get_max_batch_size()
+    except Exception:
+        return None
+
+def ingest_food_items(collection, food_items: Iterable[Dict], embed_batch_size: int = EMBEDDING_BATCH_SIZE,
+                      write_batch_size: Optional[int] = None, show_progress: bool = True,
+                      executor: Optional[Executor] = None) -> int:
+    """Stream food items into the collection in bounded batches
+
+    Items are consumed lazily from any iterable, embedded embed_batch_size at
+    a time and written with upsert in batches no larger than the client's
+    max batch size, so peak memory does not grow with the dataset.
+    With an executor, the next batch is embedded on it while the previous
+    one is written, keeping at most one batch in flight.
+    Returns the number of items written.
+    """
+    return ingest_food_records(collection, iter_food_records(food_items), embed_batch_size,
+                               write_batch_size, show_progress, executor)
+
+def ingest_food_records(collection, records: Iterable[Tuple[str, str, Dict]],
+                        embed_batch_size: int = EMBEDDING_BATCH_SIZE, write_batch_size: Optional[int] = None,
+                        show_progress: bool = True, executor: Optional[Executor] = None) -> int:
+    """Embed and upsert prepared (ID, document, metadata) records in bounded batches
+
+    This is the batching behind ingest_food_items, also used by sync to
+    write only the changed records.
+    """
+    max_batch_size = get_max_write_batch_size(collection)
+    if write_batch_size is None:
+        write_batch_size = max_batch_size or embed_batch_size
+    elif max_batch_size:
+        write_batch_size = min(write_batch_size, max_batch_size)
+    
+    pending_ids = []
+    pending_documents = []
+    pending_metadatas = []
+    pending_embeddings = []
+    total_written = 0
+    start_time = time.perf_counter()
+    
+    def flush(final: bool = False):
+        nonlocal total_written
+        while pending_ids and (final or len(pending_ids) >= write_batch_size):
+            batch = min(write_batch_size, len(pending_ids))
+            upsert_food_records(
+                collection,
+                ids=pending_ids[:batch],
+                documents=pending_documents[:batch],
+                metadatas=pending_metadatas[:batch],
+                embeddings=pending_embeddings[:batch] if pending_embeddings else None
+            )
+            del pending_ids[:batch], pending_documents[:batch], pending_metadatas[:batch], pending_embeddings[:batch]
+            total_written += batch
+            mark_collection_changed(collection.name)
+            
+            if show_progress:
+                elapsed = time.perf_counter() - start_time
+                rate = total_written / elapsed if elapsed > 0 else 0.0
+                print(f"Ingested {total_written} food items ({rate:.1f} docs/sec)")
+    
+    batch_ids = []
+    batch_documents = []
+    batch_metadatas = []
+    embedding_ahead = None
+    
+    def queue_batch(ids, documents, metadatas, embeddings):
+        pending_ids.extend(ids)
+        pending_documents.extend(documents)
+        pending_metadatas.extend(metadatas)
+        if embeddings is not None:
+            pending_embeddings.extend(embeddings)
+        flush()
+    
+    def embed_batch():
+        nonlocal embedding_ahead
+        batch = (list(batch_ids), list(batch_documents), list(batch_metadatas))
+        batch_ids.clear()
+        batch_documents.clear()
+        batch_metadatas.clear()
+        if executor is None:
+            queue_batch(*batch, embed_food_documents(collection, batch[1], verbose=False))
+            return
+        # Embed this batch on the executor while the previous one is written
+        embeddings_future = executor.submit(compute_document_embeddings, collection, batch[1])
+        if embedding_ahead is not None:
+            previous, previous_future = embedding_ahead
+            queue_batch(*previous, previous_future.result())
+        embedding_ahead = (batch, embeddings_future)
+    
+    for stable_id, text, metadata in records:
+        batch_ids.append(stable_id)
+        batch_documents.append(text)
+        batch_metadatas.append(metadata)
+        if len(batch_ids) >= embed_batch_size:
+            embed_batch()
+    
+    if batch_ids:
+        embed_batch()
+    if embedding_ahead is not None:
+        previous, previous_future = embedding_ahead
+        queue_batch(*previous, previous_future.result())
+    flush(final=True)
+    
+    if show_progress:
+        elapsed = time.perf_counter() - start_time
+        rate = total_written / elapsed if elapsed > 0 else 0.0
+        print(f"Ingestion complete: {total_written} food items in {elapsed:.2f}s ({rate:.1f} docs/sec)")
+    
+    return total_written
+
+def _record_dataset_fingerprint(collection, fingerprint: str):
+    """Store the dataset fingerprint in the collection metadata"""
+    collection_metadata = dict(collection.metadata or {})
+    collection_metadata['dataset_fingerprint'] = fingerprint
+    collection.modify(metadata=collection_metadata)
+
+def populate_similarity_collection(collection, food_items: List[Dict], embed_batch_size: int = EMBEDDING_BATCH_SIZE,
+                                   executor: Optional[Executor] = None, show_progress: bool = True):
+    """Populate collection with food data and generate embeddings
+
+    embed_batch_size and executor are passed to ingest_food_items for a
+    fresh load; show_progress prints ingestion progress and docs/sec for a
+    fresh load or sync.
+    """
+    # Skip population when a persisted collection already holds this dataset
+    fingerprint = compute_dataset_fingerprint(food_items)
+    existing_count = collection.count()
+    if existing_count > 0:
+        if (collection.metadata or {}).get('dataset_fingerprint') == fingerprint:
+            print(f"Collection '{collection.name}' is up to date ({existing_count} items), skipping population")
+            return
+        # Only apply what changed since the collection was last populated
+        sync_similarity_collection(collection, food_items, show_progress)
+        return
+    
+    # Stream the data into the collection in bounded batches
+    added_count = ingest_food_items(collection, food_items, embed_batch_size, show_progress=show_progress,
+                                    executor=executor)
+    
+    # Record the dataset so a persistent collection can be reused next run
+    _record_dataset_fingerprint(collection, fingerprint)
+    
+    print(f"Added {added_count} food items to collection")
+
+def sync_similarity_collection(collection, food_items: List[Dict], show_progress: bool = False) -> Dict[str, int]:
+    """Diff food items against the collection and apply only the changes
+
+    Items are matched by stable ID and compared by content hash: new and
+    edited items are upserted, items no longer present are deleted and
+    unchanged items are left alone.
+    """
+    existing = collection.get(include=["metadatas"])
+    existing_hashes = {
+        doc_id: (metadata or {}).get('content_hash')
+        for doc_id, metadata in zip(existing['ids'], existing['metadatas'])
+    }
+    
+    current_ids = set()
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+    
+    def changed_records():
+        for doc_id, document, metadata in iter_food_records(food_items):
+            current_ids.add(doc_id)
+            stored_hash = existing_hashes.get(doc_id)
+            if stored_hash == metadata['content_hash']:
+                counts['unchanged'] += 1
+                continue
+            counts['added' if doc_id not in existing_hashes else 'updated'] += 1
+            yield doc_id, document, metadata
+    
+    # Changed items go through the same bounded embed and write batches as ingestion
+    ingest_food_records(collection, changed_records(), show_progress=show_progress)
+    
+    deleted_ids = [doc_id for doc_id in existing_hashes if doc_id not in current_ids]
+    delete_batch_size = get_max_write_batch_size(collection) or EMBEDDING_BATCH_SIZE
+    for start in range(0, len(deleted_ids), delete_batch_size):
+        delete_food_records(collection, deleted_ids[start:start + delete_batch_size])
+    if deleted_ids:
+        mark_collection_changed(collection.name)
+    
+    _record_dataset_fingerprint(collection, compute_dataset_fingerprint(food_items))
+    
+    summary = dict(counts, deleted=len(deleted_ids))
+    print(f"Synced collection '{collection.name}': {summary['added']} added, {summary['updated']} updated, "
+          f"{summary['deleted']} deleted, {summary['unchanged']} unchanged")
+    return summary
+
+def compute_document_embeddings(collection, documents: List[str]):
+    """Embed documents via the embedding cache, or directly with the collection's model"""
+    embeddings = embed_food_documents(collection, documents, verbose=False)
+    if embeddings is None and documents:
+        embedding_function = _collection_embedding_functions.get(collection.name)
+        if embedding_function is not None:
+            embeddings = embedding_function(documents)
+    return embeddings
+
+def start_food_search(file_path: str, collection_name: str, collection_metadata: dict = None,
+                      persist_directory: Optional[str] = CHROMA_PERSIST_DIRECTORY,
+                      embed_batch_size: int = EMBEDDING_BATCH_SIZE, show_report: bool = True,
+                      storage: str = VECTOR_STORAGE, backend: str = VECTOR_BACKEND,
+                      index_type: str = FAISS_INDEX_TYPE):
+    """Load data, load the embedding model and build the index with overlapping phases
+
+    The embedding model is loaded on a background thread while the JSON is
+    parsed; the collection is then created for the known dataset size, so
+    backend "auto" can pick exact NumPy search for small catalogs.
+    Population goes through populate_similarity_collection with the same
+    thread as embed-ahead executor: the next batch is embedded while the
+    previous one is written to the index.
+    Returns (collection, food_items, phase timings in seconds).
+    """
+    timings = {}
+    startup_start = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="food-startup") as executor:
+        def load_model():
+            model_start = time.perf_counter()
+            get_embedding_function()
+            timings['model_load'] = time.perf_counter() - model_start
         
-        if not results or not results['ids'] or len(results['ids'][0]) == 0:
-            return []
+        model_future = executor.submit(load_model)
         
-        formatted_results = []
-        for i in range(len(results['ids'][0])):
-            # Calculate similarity score (1 - distance)
-            similarity_score = 1 - results['distances'][0][i]
-            
-            result = {
-                'food_id': results['ids'][0][i],
-                'food_name': results['metadatas'][0][i]['name'],
-                'food_description': results['metadatas'][0][i]['description'],
-                'cuisine_type': results['metadatas'][0][i]['cuisine_type'],
-                'food_calories_per_serving': results['metadatas'][0][i]['calories'],
-                'similarity_score': similarity_score,
-                'distance': results['distances'][0][i]
-            }
-            formatted_results.append(result)
+        # Parse the dataset while the model loads
+        data_start = time.perf_counter()
+        food_items = load_food_data(file_path)
+        timings['data_load'] = time.perf_counter() - data_start
         
-        return formatted_results
+        wait_start = time.perf_counter()
+        model_future.result()
+        timings['model_wait'] = time.perf_counter() - wait_start
+        
+        collection = create_similarity_search_collection(collection_name, collection_metadata, persist_directory,
+                                                         storage, backend, index_type,
+                                                         expected_size=len(food_items))
+        
+        population_start = time.perf_counter()
+        populate_similarity_collection(collection, food_items, embed_batch_size, executor=executor)
+        timings['index_population'] = time.perf_counter() - population_start
+    
+    timings['total'] = time.perf_counter() - startup_start
+    if show_report:
+        print_startup_report(timings)
+    return collection, food_items, timings
+
+def print_startup_report(timings: Dict[str, float]):
+    """Print the startup phase breakdown"""
+    print("⏱️ Startup phases:")
+    print(f"   Embedding model load: {timings.get('model_load', 0.0):.3f}s (background)")
+    print(f"   Data load:            {timings.get('data_load', 0.0):.3f}s")
+    print(f"   Waiting for model:    {timings.get('model_wait', 0.0):.3f}s")
+    print(f"   Index population:     {timings.get('index_population', 0.0):.3f}s")
+    print(f"   Total:                {timings.get('total', 0.0):.3f}s")
+
+def format_search_results(results, query_index: int = 0) -> List[Dict]:
+    """Convert one query's slice of a Chroma query response into result dicts"""
+    if not results or not results['ids'] or len(results['ids'][query_index]) == 0:
+        return []
+    
+    formatted_results = []
+    for i in range(len(results['ids'][query_index])):
+        # Calculate similarity score (1 - distance)
+        similarity_score = 1 - results['distances'][query_index][i]
+        metadata = results['metadatas'][query_index][i]
+        
+        result = {
+            'food_id': results['ids'][query_index][i],
+            'food_name': metadata['name'],
+            'food_description': metadata['description'],
+            'cuisine_type': metadata['cuisine_type'],
+            'food_calories_per_serving': metadata['calories'],
+            'similarity_score': similarity_score,
+            'distance': results['distances'][query_index][i]
+        }
+        formatted_results.append(result)
+    
+    return formatted_results
+
+def embed_queries(collection, queries: List[str]) -> Optional[List[Any]]:
+    """Embed query texts through the shared memo, or return None if the model is unknown"""
+    embedding_function = _collection_embedding_functions.get(collection.name)
+    if embedding_function is None:
+        return None
+    model_name = getattr(embedding_function, 'model_name', EMBEDDING_MODEL_NAME)
+    return query_embedding_memo.embed(model_name, list(queries), embedding_function)
+
+def _query_collection(collection, queries: List[str], n_results: int, where: Optional[Dict] = None,
+                      where_document: Optional[Dict] = None):
+    """Query the collection with memoized query embeddings"""
+    query_embeddings = embed_queries(collection, queries)
+    if query_embeddings is None:
+        return collection.query(query_texts=list(queries), n_results=n_results, where=where,
+                                where_document=where_document)
+    return collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where,
+                            where_document=where_document)
+
+def perform_similarity_search(collection, query: str, n_results: int = 5) -> List[Dict]:
+    """Perform similarity search and return formatted results"""
+    try:
+        results = _query_collection(collection, [query], n_results)
+        
+        return format_search_results(results)
         
     except Exception as e:
         print(f"Error in similarity search: {e}")
         return []
 
-def perform_filtered_similarity_search(collection, query: str, cuisine_filter: str = None, 
-                                     max_calories: int = None, n_results: int = 5) -> List[Dict]:
-    """Perform filtered similarity search with metadata constraints"""
-    where_clause = None
+def perform_similarity_search_batch(collection, queries: List[str], n_results: int = 5) -> List[List[Dict]]:
+    """Run many similarity searches with one embedding pass and one multi-query lookup"""
+    if not queries:
+        return []
     
-    # Build filters list
-    filters = []
-    if cuisine_filter:
-        filters.append({"cuisine_type": cuisine_filter})
+    try:
+        # Queries not seen before are embedded in a single forward pass
+        results = _query_collection(collection, queries, n_results)
+        
+        return [format_search_results(results, i) for i in range(len(queries))]
+        
+    except Exception as e:
+        print(f"Error in batch similarity search: {e}")
+        return [[] for _ in queries]
+
+def get_metadata_statistics(collection) -> 'MetadataStatistics':
+    """Return planner statistics for a collection, rebuilt when its version changes
+
+    In-process indexes supply them from their columnar metadata store; for
+    Chroma every metadata dict is fetched and counted.
+    """
+    from query_planner import MetadataStatistics
+    version = get_collection_version(collection)
+    cached = _collection_statistics.get(collection.name)
+    if cached is None or cached[0] != version:
+        if hasattr(collection, 'metadata_columns'):
+            statistics = MetadataStatistics.from_columns(collection.metadata_columns())
+        else:
+            statistics = MetadataStatistics.from_metadatas(collection.get(include=["metadatas"])['metadatas'])
+        cached = (version, statistics)
+        _collection_statistics[collection.name] = cached
+    return cached[1]
+
+def _exact_subset_query(collection, query_embedding, n_results: int, where: Optional[Dict],
+                        where_document: Optional[Dict] = None):
+    """Rank every item matching the filter exactly, in a Chroma-shaped result"""
+    import numpy as np
+    subset = collection.get(where=where, where_document=where_document, include=["embeddings", "metadatas"])
+    results = {'ids': [[]], 'distances': [[]], 'metadatas': [[]]}
+    if not subset['ids']:
+        return results
+    
+    vectors = np.asarray(subset['embeddings'], dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query_vector = np.asarray(query_embedding, dtype=np.float32)
+    similarities = vectors @ (query_vector / max(np.linalg.norm(query_vector), 1e-12))
+    
+    k = min(n_results, len(similarities))
+    top = np.argpartition(-similarities, k - 1)[:k]
+    top = top[np.argsort(-similarities[top])]
+    results['ids'][0] = [subset['ids'][i] for i in top]
+    results['distances'][0] = [float(1.0 - similarities[i]) for i in top]
+    results['metadatas'][0] = [subset['metadatas'][i] for i in top]
+    return results
+
+def _planned_filtered_query(collection, query: str, n_results: int, where: Optional[Dict],
+                            where_document: Optional[Dict] = None):
+    """Run a filtered query with the strategy chosen by the query planner"""
+    from query_planner import logger, plan_filtered_query
+    
+    query_embeddings = embed_queries(collection, [query])
+    if query_embeddings is None or not (where or where_document):
+        return _query_collection(collection, [query], n_results, where=where, where_document=where_document)
+    if getattr(collection, 'exhaustive_search', False):
+        # The index scans every match exactly, so there is nothing to plan or estimate
+        logger.info("Filtered query plan: index_filter (exhaustive index)")
+        return collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where,
+                                where_document=where_document)
     
-    if max_calories:
-        filters.append({"calories": {"$lte": max_calories}})
+    plan = plan_filtered_query(get_metadata_statistics(collection), where, n_results,
+                               where_document=where_document,
+                               filtered_index=getattr(collection, 'filtered_search', False))
+    if plan['strategy'] == 'index_filter':
+        results = collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where,
+                                   where_document=where_document)
+        if len(results['ids'][0]) < n_results:
+            # A filtered graph or IVF search can miss matches; rank the subset exactly instead
+            logger.info("Filtered ANN search returned %d of %d requested results, falling back to prefilter_exact",
+                        len(results['ids'][0]), n_results)
+            return _exact_subset_query(collection, query_embeddings[0], n_results, where, where_document)
+        return results
+    if plan['strategy'] == 'prefilter_exact':
+        return _exact_subset_query(collection, query_embeddings[0], n_results, where, where_document)
     
-    # Construct where clause based on number of filters
-    if len(filters) == 1:
-        where_clause = filters[0]
-    elif len(filters) > 1:
-        where_clause = {"$and": filters}
+    # ANN over the whole collection for an oversampled k, then drop non-matching hits
+    from vector_index import match_where, match_where_document
+    results = collection.query(query_embeddings=query_embeddings, n_results=plan['k'])
+    kept = [
+        i for i, (metadata, document) in enumerate(zip(results['metadatas'][0], results['documents'][0]))
+        if match_where(metadata or {}, where) and match_where_document(document, where_document)
+    ]
+    if len(kept) < n_results:
+        # Not enough matches survived: fall back to an exact scan so the result set is complete
+        logger.info("Post-filter kept %d of %d requested results, falling back to prefilter_exact",
+                    len(kept), n_results)
+        return _exact_subset_query(collection, query_embeddings[0], n_results, where, where_document)
+    
+    kept = kept[:n_results]
+    return {
+        'ids': [[results['ids'][0][i] for i in kept]],
+        'distances': [[results['distances'][0][i] for i in kept]],
+        'metadatas': [[results['metadatas'][0][i] for i in kept]]
+    }
+
+def _normalize_query(query: str) -> str:
+    """Normalize query text for cache lookups"""
+    return ' '.join(query.lower().split())
+
+# Compiled (where, where_document) pairs kept for hot filter shapes
+FILTER_COMPILE_CACHE_SIZE = 256
+
+def _as_tuple(values: Union[None, str, Sequence[str]]) -> Tuple[str, ...]:
+    """Normalize a single value or a sequence of values to a sorted tuple"""
+    if not values:
+        return ()
+    if isinstance(values, str):
+        return (values,)
+    return tuple(sorted(set(values)))
+
+@dataclass(frozen=True)
+class FoodFilter:
+    """Typed filter for food searches, compiled to Chroma where/where_document clauses
+
+    Single values or sequences are accepted for cuisines, cooking methods and
+    ingredients; they are stored as sorted tuples so equal filters are equal
+    and hashable, which lets compile_food_filter cache them.
+
+    Ingredients match by word, ignoring case and simple plurals: "egg" finds
+    "Eggs" but not "Eggplant", and excluding "cheese" drops "Feta Cheese".
+    A multi-word ingredient needs all of its words in the dish's ingredients.
+    """
+    cuisines: Tuple[str, ...] = ()
+    min_calories: Optional[int] = None
+    max_calories: Optional[int] = None
+    include_ingredients: Tuple[str, ...] = ()
+    exclude_ingredients: Tuple[str, ...] = ()
+    cooking_methods: Tuple[str, ...] = ()
+    
+    def __post_init__(self):
+        for field in ('cuisines', 'include_ingredients', 'exclude_ingredients', 'cooking_methods'):
+            object.__setattr__(self, field, _as_tuple(getattr(self, field)))
+
+def _equality_clause(field: str, values: Tuple[str, ...]) -> Dict:
+    if len(values) == 1:
+        return {field: values[0]}
+    return {field: {"$in": list(values)}}
+
+@functools.lru_cache(maxsize=FILTER_COMPILE_CACHE_SIZE)
+def compile_food_filter(food_filter: FoodFilter) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Compile a FoodFilter to (where, where_document) for Chroma and the in-process indexes
+
+    Every field is a metadata clause, so where_document is None; it stays in
+    the result for filters on document text. Results are cached per filter,
+    so callers must not modify the returned dicts.
+    """
+    where_clauses = []
+    if food_filter.cuisines:
+        where_clauses.append(_equality_clause("cuisine_type", food_filter.cuisines))
+    if food_filter.cooking_methods:
+        where_clauses.append(_equality_clause("cooking_method", food_filter.cooking_methods))
+    # Chroma allows one operator per field expression, so range bounds are separate clauses
+    if food_filter.min_calories is not None:
+        where_clauses.append({"calories": {"$gte": food_filter.min_calories}})
+    if food_filter.max_calories is not None:
+        where_clauses.append({"calories": {"$lte": food_filter.max_calories}})
+    # Ingredients match the per-word flags written by build_food_metadata
+    for ingredient in food_filter.include_ingredients:
+        where_clauses.extend({flag: True} for flag in ingredient_flags(ingredient))
+    for ingredient in food_filter.exclude_ingredients:
+        # A dish is excluded when it has every word of the ingredient
+        missing = [{flag: {"$ne": True}} for flag in ingredient_flags(ingredient)]
+        if missing:
+            where_clauses.append(missing[0] if len(missing) == 1 else {"$or": missing})
+    
+    if not where_clauses:
+        return None, None
+    return (where_clauses[0] if len(where_clauses) == 1 else {"$and": where_clauses}), None
+
+def perform_food_filter_search(collection, query: str, food_filter: FoodFilter, n_results: int = 5,
+                               use_cache: bool = True) -> List[Dict]:
+    """Similarity search restricted by a FoodFilter
+
+    Results are served from query_result_cache when the same normalized query,
+    filter and collection version were searched recently. Otherwise the
+    query planner picks between an exact scan of the matching items and ANN
+    search with oversampled k plus post-filtering.
+    """
+    cache_key = (collection.name, _normalize_query(query), food_filter, n_results,
+                 get_collection_version(collection))
+    if use_cache:
+        cached_results = query_result_cache.get(cache_key)
+        if cached_results is not None:
+            return cached_results
+    
+    where_clause, where_document = compile_food_filter(food_filter)
     
     try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_clause
-        )
+        results = _planned_filtered_query(collection, query, n_results, where_clause, where_document)
+        
+        formatted_results = format_search_results(results)
+        if use_cache:
+            query_result_cache.put(cache_key, formatted_results)
+        return formatted_results
         
-        if not results or not results['ids'] or len(results['ids'][0]) == 0:
+    except Exception as e:
+        print(f"Error in filtered search: {e}")
+        return []
+
+def perform_filtered_similarity_search(collection, query: str, cuisine_filter: str = None, 
+                                     max_calories: int = None, n_results: int = 5,
+                                     use_cache: bool = True) -> List[Dict]:
+    """Perform filtered similarity search with metadata constraints"""
+    food_filter = FoodFilter(cuisines=cuisine_filter, max_calories=max_calories or None)
+    return perform_food_filter_search(collection, query, food_filter, n_results, use_cache)
+
+# Candidates taken from each ranking, and the reciprocal rank fusion constant
+HYBRID_CANDIDATES = 50
+RRF_K = 60
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists by summing 1 / (rrf_k + rank) per id, best first"""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+def _score_stored_items(collection, query: str, ids: List[str]) -> Dict[str, Dict]:
+    """Format stored items as search results, scored with their stored vectors"""
+    import numpy as np
+    stored = collection.get(ids=ids, include=["metadatas", "embeddings"])
+    query_embeddings = embed_queries(collection, [query])
+    distances = [1.0] * len(stored['ids'])
+    if query_embeddings is not None and len(stored['ids']):
+        vectors = np.asarray(stored['embeddings'], dtype=np.float32)
+        query_vector = np.asarray(query_embeddings[0], dtype=np.float32)
+        similarities = vectors @ query_vector / np.maximum(
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_vector), 1e-12)
+        distances = [float(1.0 - similarity) for similarity in similarities]
+    results = {'ids': [stored['ids']], 'distances': [distances], 'metadatas': [stored['metadatas']]}
+    return {result['food_id']: result for result in format_search_results(results)}
+
+def perform_hybrid_search(collection, query: str, n_results: int = 5, candidates: int = HYBRID_CANDIDATES,
+                          rrf_k: int = RRF_K) -> List[Dict]:
+    """Fuse BM25 and vector rankings with reciprocal rank fusion
+
+    Exact ingredient names ("cinnamon", "cocoa powder") are found by the
+    collection's BM25 index even when the embedding ranks them low. Items
+    found only lexically are scored from their stored vectors, so no extra
+    embedding calls are made. Each result also carries fusion_score,
+    vector_rank and lexical_rank (None when absent from that ranking).
+    """
+    try:
+        candidates = min(max(candidates, n_results), collection.count())
+        if candidates <= 0:
             return []
         
-        formatted_results = []
-        for i in range(len(results['ids'][0])):
-            similarity_score = 1 - results['distances'][0][i]
-            
-            result = {
-                'food_id': results['ids'][0][i],
-                'food_name': results['metadatas'][0][i]['name'],
-                'food_description': results['metadatas'][0][i]['description'],
-                'cuisine_type': results['metadatas'][0][i]['cuisine_type'],
-                'food_calories_per_serving': results['metadatas'][0][i]['calories'],
-                'similarity_score': similarity_score,
-                'distance': results['distances'][0][i]
-            }
-            formatted_results.append(result)
+        vector_hits = {result['food_id']: result
+                       for result in format_search_results(_query_collection(collection, [query], candidates))}
+        lexical_ranking = [doc_id for doc_id, _ in get_lexical_index(collection).search(query, candidates)]
+        fused = reciprocal_rank_fusion([list(vector_hits), lexical_ranking], rrf_k)[:n_results]
         
-        return formatted_results
+        lexical_only = [doc_id for doc_id, _ in fused if doc_id not in vector_hits]
+        if lexical_only:
+            vector_hits.update(_score_stored_items(collection, query, lexical_only))
+        
+        vector_ranks = {doc_id: rank for rank, doc_id in enumerate(vector_hits, start=1)}
+        lexical_ranks = {doc_id: rank for rank, doc_id in enumerate(lexical_ranking, start=1)}
+        results = []
+        for doc_id, fusion_score in fused:
+            result = dict(vector_hits[doc_id])
+            result['fusion_score'] = fusion_score
+            result['vector_rank'] = vector_ranks[doc_id] if doc_id not in lexical_only else None
+            result['lexical_rank'] = lexical_ranks.get(doc_id)
+            results.append(result)
+        return results
         
     except Exception as e:
-        print(f"Error in filtered search: {e}")
-        return []
\ No newline at end of file
+        print(f"Error in hybrid search: {e}")
+        return []
+
+def get_search_executor() -> Executor:
+    """Return the shared thread pool for blocking search calls"""
+    global _search_executor
+    if _search_executor is None:
+        _search_executor = ThreadPoolExecutor(max_workers=SEARCH_EXECUTOR_WORKERS,
+                                              thread_name_prefix="food-search")
+    return _search_executor
+
+async def run_blocking(func, *args, executor: Optional[Executor] = None, **kwargs):
+    """Run a blocking call in an executor without blocking the event loop"""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or get_search_executor(),
+                                      functools.partial(func, *args, **kwargs))
+
+async def async_perform_similarity_search(collection, query: str, n_results: int = 5) -> List[Dict]:
+    """Async variant of perform_similarity_search"""
+    return await run_blocking(perform_similarity_search, collection, query, n_results)
+
+async def async_perform_similarity_search_batch(collection, queries: List[str],
+                                                n_results: int = 5) -> List[List[Dict]]:
+    """Async variant of perform_similarity_search_batch"""
+    return await run_blocking(perform_similarity_search_batch, collection, queries, n_results)
+
+async def async_perform_food_filter_search(collection, query: str, food_filter: FoodFilter,
+                                           n_results: int = 5, use_cache: bool = True) -> List[Dict]:
+    """Async variant of perform_food_filter_search"""
+    return await run_blocking(perform_food_filter_search, collection, query, food_filter, n_results, use_cache)
+
+async def async_perform_hybrid_search(collection, query: str, n_results: int = 5) -> List[Dict]:
+    """Async variant of perform_hybrid_search"""
+    return await run_blocking(perform_hybrid_search, collection, query, n_results)
+
+async def async_perform_filtered_similarity_search(collection, query: str, cuisine_filter: str = None,
+                                                   max_calories: int = None, n_results: int = 5,
+                                                   use_cache: bool = True) -> List[Dict]:
+    """Async variant of perform_filtered_similarity_search"""
+    return await run_blocking(perform_filtered_similarity_search, collection, query,
+                              cuisine_filter, max_calories, n_results, use_cache)
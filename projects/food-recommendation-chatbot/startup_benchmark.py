@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Entry-point modules whose import cost is tracked
+DEFAULT_MODULES = ["shared_functions", "interactive_search", "advanced_search",
+                   "enhanced_rag_chatbot", "system_comparison"]
+
+# Heavy packages that must only be imported on first use, never at startup
+LAZY_PACKAGES = ["chromadb", "numpy", "sentence_transformers", "torch", "ibm_watsonx_ai"]
+
+# Maximum cumulative import time per module, in milliseconds
+DEFAULT_BUDGET_MS = 150.0
+
+def measure_import_time(module: str) -> Dict:
+    """Import a module in a fresh interpreter with -X importtime and parse the report"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append({
+            'name': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+
+    top_level = next((entry for entry in imports if entry['name'] == module), None)
+    loaded_packages = {entry['name'].split('.')[0] for entry in imports}
+    return {
+        'module': module,
+        'returncode': completed.returncode,
+        'cumulative_ms': top_level['cumulative_ms'] if top_level else None,
+        'eager_heavy_imports': sorted(loaded_packages.intersection(LAZY_PACKAGES)),
+        'slowest_imports': sorted(imports, key=lambda entry: entry['self_ms'], reverse=True)[:10],
+        'error': completed.stderr.strip().splitlines()[-1] if completed.returncode else None
+    }
+
+def check_regressions(results: List[Dict], budget_ms: float) -> List[str]:
+    """Return a description of every module over budget or importing heavy packages eagerly"""
+    problems = []
+    for result in results:
+        if result['returncode'] != 0:
+            problems.append(f"{result['module']}: import failed ({result['error']})")
+            continue
+        if result['cumulative_ms'] is not None and result['cumulative_ms'] > budget_ms:
+            problems.append(f"{result['module']}: {result['cumulative_ms']:.1f}ms exceeds {budget_ms:.0f}ms budget")
+        if result['eager_heavy_imports']:
+            problems.append(f"{result['module']}: imports {', '.join(result['eager_heavy_imports'])} at startup")
+    return problems
+
+def main():
+    """Measure entry-point import time and fail on startup regressions"""
+    parser = argparse.ArgumentParser(description="Import-time startup benchmark (python -X importtime)")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help="Maximum cumulative import time per module")
+    parser.add_argument('--output', help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = [measure_import_time(module) for module in args.modules]
+
+    print("🚀 STARTUP IMPORT TIMES")
+    print("=" * 60)
+    for result in results:
+        cumulative = f"{result['cumulative_ms']:.1f}ms" if result['cumulative_ms'] is not None else "failed"
+        print(f"{result['module']:<28} {cumulative:>10}")
+        for entry in result['slowest_imports'][:3]:
+            print(f"   {entry['name']:<40} {entry['self_ms']:.1f}ms self")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'budget_ms': args.budget_ms, 'results': results}, file, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    problems = check_regressions(results, args.budget_ms)
+    if problems:
+        print("\n❌ Startup regressions:")
+        for problem in problems:
+            print(f"   • {problem}")
+        sys.exit(1)
+    print("\n✅ All entry points within budget and free of eager heavy imports")
+
+if __name__ == "__main__":
+    main()
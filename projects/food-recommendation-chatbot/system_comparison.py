@@ -1,23 +1,19 @@
 from shared_functions import *
-import time
+from benchmark_search import DEFAULT_WORKLOAD_FILE, load_query_workload, print_benchmark_report, run_benchmarks
+
+# Benchmark settings for the performance comparison
+COMPARISON_WARMUP = 5
+COMPARISON_REPETITIONS = 10
 
 def main():
     """Compare all three search systems with the same query"""
     print("🔬 FOOD SEARCH SYSTEMS COMPARISON")
     print("=" * 50)
     
-    # Load data once for all systems
-    food_items = load_food_data('./FoodDataSet.json')
-    
-    # Create collections for each system
-    interactive_collection = create_similarity_search_collection("comparison_interactive")
-    advanced_collection = create_similarity_search_collection("comparison_advanced")
-    rag_collection = create_similarity_search_collection("comparison_rag")
-    
-    # Populate all collections
-    populate_similarity_collection(interactive_collection, food_items)
-    populate_similarity_collection(advanced_collection, food_items)
-    populate_similarity_collection(rag_collection, food_items)
+    # Load data and build the index once; all three systems search the same collection
+    collection, food_items, startup_timings = start_food_search('./FoodDataSet.json', "comparison_shared")
+    build_time = startup_timings['total']
+    print(f"🏗️ Index build time: {build_time:.3f} seconds (shared by all systems)")
     
     # Test query
     test_query = "chocolate dessert"
@@ -28,43 +24,33 @@ def main():
     # System 1: Interactive Search Style
     print("\n1️⃣ INTERACTIVE SEARCH APPROACH:")
     print("-" * 30)
-    start_time = time.time()
-    interactive_results = perform_similarity_search(interactive_collection, test_query, 3)
-    interactive_time = time.time() - start_time
+    interactive_results = perform_similarity_search(collection, test_query, 3)
     
     for i, result in enumerate(interactive_results, 1):
         print(f"{i}. {result['food_name']} ({result['similarity_score']*100:.1f}% match)")
         print(f"   {result['food_description']}")
-    print(f"⏱️ Response time: {interactive_time:.3f} seconds")
     
     # System 2: Advanced Search Style
     print("\n2️⃣ ADVANCED SEARCH APPROACH:")
     print("-" * 30)
-    start_time = time.time()
-    
     # Show basic search
-    basic_results = perform_similarity_search(advanced_collection, test_query, 3)
+    basic_results = perform_similarity_search(collection, test_query, 3)
     print("📋 Basic results:")
     for i, result in enumerate(basic_results, 1):
         print(f"   {i}. {result['food_name']} - {result['cuisine_type']} ({result['food_calories_per_serving']} cal)")
     
     # Show filtered search
     spicy_results = perform_filtered_similarity_search(
-        advanced_collection, test_query, cuisine_filter="Indian", n_results=2
+        collection, test_query, cuisine_filter="Indian", n_results=2
     )
     print("🌶️ Filtered for Indian cuisine:")
     for i, result in enumerate(spicy_results, 1):
         print(f"   {i}. {result['food_name']} ({result['similarity_score']*100:.1f}% match)")
     
-    advanced_time = time.time() - start_time
-    print(f"⏱️ Response time: {advanced_time:.3f} seconds")
-    
     # System 3: RAG Chatbot Style
     print("\n3️⃣ RAG CHATBOT APPROACH:")
     print("-" * 30)
-    start_time = time.time()
-    
-    rag_results = perform_similarity_search(rag_collection, test_query, 3)
+    rag_results = perform_similarity_search(collection, test_query, 3)
     
     # Generate RAG-style response
     rag_response = f"Perfect! I found some excellent chocolate dessert options for you. "
@@ -77,9 +63,6 @@ def main():
     
     print(f"🤖 Bot: {rag_response}")
     
-    rag_time = time.time() - start_time
-    print(f"⏱️ Response time: {rag_time:.3f} seconds")
-    
     # Comparison Summary
     print("\n📊 SYSTEM COMPARISON SUMMARY:")
     print("=" * 50)
@@ -100,10 +83,17 @@ def main():
     print("  ✅ Conversational experience")
     print("  ❌ More complex implementation")
     
-    print(f"\n⏱️ Performance Comparison:")
-    print(f"  Interactive: {interactive_time:.3f}s")
-    print(f"  Advanced: {advanced_time:.3f}s")
-    print(f"  RAG Chatbot: {rag_time:.3f}s")
+    # Time each approach over the benchmark workload instead of a single query
+    workload = load_query_workload(DEFAULT_WORKLOAD_FILE)
+    report = run_benchmarks(collection, workload, COMPARISON_WARMUP, COMPARISON_REPETITIONS)
+    print_benchmark_report(report)
+    
+    results = report['results']
+    print(f"\n⏱️ Performance Comparison (query time only, p50 / p95):")
+    print(f"  Index build (one-time): {build_time:.3f}s")
+    print(f"  Interactive: {results['perform_similarity_search']['p50_ms']:.2f}ms / {results['perform_similarity_search']['p95_ms']:.2f}ms")
+    print(f"  Advanced: {results['perform_filtered_similarity_search']['p50_ms']:.2f}ms / {results['perform_filtered_similarity_search']['p95_ms']:.2f}ms")
+    print(f"  RAG Chatbot: {results['rag']['p50_ms']:.2f}ms / {results['rag']['p95_ms']:.2f}ms")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
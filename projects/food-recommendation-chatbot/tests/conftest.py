@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The project modules are flat scripts next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from vector_index import PQ_MIN_TRAINING_VECTORS, FaissVectorIndex
+
+faiss = pytest.importorskip("faiss")
+
+
+def make_vectors(count: int, dimension: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+
+
+def test_trained_ivfpq_supports_delete_and_upsert():
+    count = PQ_MIN_TRAINING_VECTORS
+    vectors = make_vectors(count + 1)
+    index = FaissVectorIndex("ivfpq_regression", index_type='ivfpq')
+    index.add(ids=[str(i) for i in range(count)], embeddings=vectors[:count],
+              metadatas=[{'calories': i} for i in range(count)])
+    assert not index.exhaustive_search
+
+    index.delete(ids=['1', '2', '3'])
+    index.upsert(ids=['4', str(count)], embeddings=vectors[[100, count]],
+                 metadatas=[{'calories': 4}, {'calories': count}])
+
+    assert index.count() == count - 2
+    assert index.get(ids=['1'])['ids'] == []
+    results = index.query(query_embeddings=vectors[[count]], n_results=1)
+    assert results['ids'][0] == [str(count)]
+    filtered = index.query(query_embeddings=vectors[[100]], n_results=3, where={'calories': {'$lte': 10}})
+    assert '4' in filtered['ids'][0]
+    assert all(int(doc_id) <= 10 for doc_id in filtered['ids'][0])
+
+
+def test_small_ivfpq_catalog_stays_exact():
+    vectors = make_vectors(1000)
+    index = FaissVectorIndex("ivfpq_small", index_type='ivfpq', ivf_train_size=256)
+    index.add(ids=[str(i) for i in range(1000)], embeddings=vectors)
+    assert index.exhaustive_search
+    assert index.query(query_embeddings=vectors[[7]], n_results=1)['ids'][0] == ['7']
@@ -0,0 +1,644 @@
+import tempfile
+import numpy as np
+from metadata_index import ColumnarMetadataStore
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Rows scored per block when dequantizing, bounds temporary float32 memory
+SCORING_BLOCK_ROWS = 65536
+
+def match_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """Evaluate a Chroma-style where clause against one metadata dict"""
+    if not where:
+        return True
+    if '$and' in where:
+        return all(match_where(metadata, clause) for clause in where['$and'])
+    if '$or' in where:
+        return any(match_where(metadata, clause) for clause in where['$or'])
+
+    for field, condition in where.items():
+        value = metadata.get(field)
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        for operator, operand in condition.items():
+            if operator == '$eq' and not value == operand:
+                return False
+            if operator == '$ne' and not value != operand:
+                return False
+            if operator == '$in' and value not in operand:
+                return False
+            if operator == '$nin' and value in operand:
+                return False
+            if operator in ('$gt', '$gte', '$lt', '$lte'):
+                if value is None:
+                    return False
+                if operator == '$gt' and not value > operand:
+                    return False
+                if operator == '$gte' and not value >= operand:
+                    return False
+                if operator == '$lt' and not value < operand:
+                    return False
+                if operator == '$lte' and not value <= operand:
+                    return False
+    return True
+
+def match_where_document(document: str, where_document: Optional[Dict]) -> bool:
+    """Evaluate a Chroma-style where_document clause against one document"""
+    if not where_document:
+        return True
+    if '$and' in where_document:
+        return all(match_where_document(document, clause) for clause in where_document['$and'])
+    if '$or' in where_document:
+        return any(match_where_document(document, clause) for clause in where_document['$or'])
+    if '$contains' in where_document:
+        return where_document['$contains'] in (document or '')
+    if '$not_contains' in where_document:
+        return where_document['$not_contains'] not in (document or '')
+    return True
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Return vectors as a float32 matrix with unit-length rows"""
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class InProcessVectorIndex:
+    """Base class for in-process vector indexes with a Chroma collection interface.
+
+    Subclasses store unit-normalized vectors and implement the _store_vectors,
+    _move_row, _truncate, _row_vectors and _search hooks. Ids, documents,
+    metadata and where filtering are handled here, so search functions in
+    shared_functions can use these indexes exactly like a Chroma collection.
+    Where clauses on cuisine, cooking method and calories are evaluated as
+    vectorized masks over a ColumnarMetadataStore.
+    Distances are cosine distances (1 - cosine similarity), as in Chroma.
+    """
+
+    # True when filtered queries are exact over all matching rows
+    exhaustive_search = False
+
+    # Where filters restrict the search itself (a row mask or FAISS ID selector)
+    filtered_search = True
+
+    def __init__(self, name: str, metadata: Optional[Dict] = None,
+                 embedding_function: Optional[Callable] = None):
+        self.name = name
+        self.metadata = metadata
+        self._embedding_function = embedding_function
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict]] = []
+        self._columns = ColumnarMetadataStore()
+
+    # Subclass hooks
+
+    def _store_vectors(self, rows: np.ndarray, vectors: np.ndarray):
+        raise NotImplementedError
+
+    def _remove_row(self, row: int):
+        """Called before a row is overwritten by the last row during delete"""
+        pass
+
+    def _move_row(self, source: int, target: int):
+        raise NotImplementedError
+
+    def _truncate(self, count: int):
+        raise NotImplementedError
+
+    def _row_vectors(self, rows: Sequence[int]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _search(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray]):
+        """Return (rows, similarities), each shaped (len(queries), <=k), best first"""
+        raise NotImplementedError
+
+    # Collection interface
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def metadata_columns(self) -> ColumnarMetadataStore:
+        """Columnar copy of the indexed metadata fields; callers must not modify it"""
+        return self._columns
+
+    def modify(self, name: Optional[str] = None, metadata: Optional[Dict] = None):
+        if name:
+            self.name = name
+        if metadata is not None:
+            self.metadata = metadata
+
+    def _embed(self, documents: Optional[List[str]], embeddings):
+        if embeddings is not None:
+            return normalize_rows(embeddings)
+        if self._embedding_function is None or documents is None:
+            raise ValueError(f"Index '{self.name}' needs embeddings or an embedding function")
+        return normalize_rows(self._embedding_function(list(documents)))
+
+    def _write(self, ids: List[str], documents, metadatas, embeddings, overwrite: bool):
+        ids = [str(doc_id) for doc_id in ids]
+        if not ids:
+            return
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        vectors = self._embed(documents, embeddings)
+
+        rows = []
+        keep = []
+        for i, doc_id in enumerate(ids):
+            row = self._row_of.get(doc_id)
+            if row is None:
+                row = len(self._ids)
+                self._row_of[doc_id] = row
+                self._ids.append(doc_id)
+                self._documents.append(documents[i])
+                self._metadatas.append(metadatas[i])
+            elif overwrite:
+                self._documents[row] = documents[i]
+                self._metadatas[row] = metadatas[i]
+            else:
+                continue
+            rows.append(row)
+            keep.append(i)
+
+        if rows:
+            self._columns.set_rows(rows, [self._metadatas[row] for row in rows])
+            self._store_vectors(np.asarray(rows, dtype=np.int64), vectors[keep])
+
+    def add(self, ids, documents=None, metadatas=None, embeddings=None):
+        """Insert new items; ids that already exist are left unchanged"""
+        self._write(ids, documents, metadatas, embeddings, overwrite=False)
+
+    def upsert(self, ids, documents=None, metadatas=None, embeddings=None):
+        """Insert new items and overwrite existing ones"""
+        self._write(ids, documents, metadatas, embeddings, overwrite=True)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None):
+        """Remove items by id and/or metadata filter"""
+        targets = set(str(doc_id) for doc_id in ids) if ids is not None else set(self._ids)
+        if where:
+            mask = self.filter_mask(where)
+            targets = {doc_id for doc_id in targets if doc_id in self._row_of and mask[self._row_of[doc_id]]}
+
+        for doc_id in targets:
+            row = self._row_of.get(doc_id)
+            if row is None:
+                continue
+            # Remove the vector first so a failing index leaves the bookkeeping intact
+            self._remove_row(row)
+            del self._row_of[doc_id]
+            # Move the last row into the hole to keep storage contiguous
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._ids[row] = moved_id
+                self._documents[row] = self._documents[last]
+                self._metadatas[row] = self._metadatas[last]
+                self._row_of[moved_id] = row
+                self._columns.move_row(last, row)
+                self._move_row(last, row)
+            self._ids.pop()
+            self._documents.pop()
+            self._metadatas.pop()
+            self._columns.truncate(len(self._ids))
+            self._truncate(len(self._ids))
+
+    def filter_mask(self, where: Optional[Dict] = None,
+                    where_document: Optional[Dict] = None) -> Optional[np.ndarray]:
+        """Boolean mask of rows matching the filters, or None when unfiltered"""
+        if not where and not where_document:
+            return None
+        mask = self._columns.mask(where)
+        if mask is None:
+            # Clause touches fields without a column, evaluate the metadata dicts
+            mask = np.fromiter((match_where(metadata or {}, where) for metadata in self._metadatas),
+                               dtype=bool, count=len(self._ids))
+        if where_document:
+            rows = np.flatnonzero(mask)
+            mask[rows] = [match_where_document(self._documents[row], where_document) for row in rows]
+        return mask
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            where_document: Optional[Dict] = None, include=("metadatas", "documents")) -> Dict[str, Any]:
+        """Fetch items by id and/or filter"""
+        if ids is not None:
+            rows = [self._row_of[str(doc_id)] for doc_id in ids if str(doc_id) in self._row_of]
+        else:
+            rows = list(range(len(self._ids)))
+        mask = self.filter_mask(where, where_document)
+        if mask is not None:
+            rows = [row for row in rows if mask[row]]
+        rows = rows[offset or 0:]
+        if limit is not None:
+            rows = rows[:limit]
+
+        return {
+            'ids': [self._ids[row] for row in rows],
+            'documents': [self._documents[row] for row in rows] if 'documents' in include else None,
+            'metadatas': [self._metadatas[row] for row in rows] if 'metadatas' in include else None,
+            'embeddings': self._row_vectors(rows) if 'embeddings' in include else None
+        }
+
+    def query(self, query_embeddings=None, query_texts: Optional[List[str]] = None, n_results: int = 10,
+              where: Optional[Dict] = None, where_document: Optional[Dict] = None,
+              include=("metadatas", "documents", "distances")) -> Dict[str, Any]:
+        """Nearest-neighbour search returning a Chroma-shaped result dict"""
+        if query_embeddings is None:
+            if self._embedding_function is None:
+                raise ValueError(f"Index '{self.name}' needs query embeddings or an embedding function")
+            query_embeddings = self._embedding_function(list(query_texts))
+        queries = normalize_rows(query_embeddings)
+
+        results = {'ids': [], 'distances': [], 'metadatas': [], 'documents': [], 'embeddings': None}
+        allowed = self.filter_mask(where, where_document)
+        k = min(n_results, len(self._ids) if allowed is None else int(allowed.sum()))
+        if k <= 0:
+            for _ in range(len(queries)):
+                for key in ('ids', 'distances', 'metadatas', 'documents'):
+                    results[key].append([])
+            return results
+
+        rows, similarities = self._search(queries, k, allowed)
+        for query_rows, query_similarities in zip(rows, similarities):
+            valid = [(int(row), float(sim)) for row, sim in zip(query_rows, query_similarities) if row >= 0]
+            results['ids'].append([self._ids[row] for row, _ in valid])
+            results['distances'].append([1.0 - sim for _, sim in valid])
+            results['metadatas'].append([self._metadatas[row] for row, _ in valid])
+            results['documents'].append([self._documents[row] for row, _ in valid])
+        return results
+
+
+def top_k_rows(scores: np.ndarray, k: int):
+    """Return (rows, scores) of the k highest scores per query row, best first"""
+    k = min(k, scores.shape[1])
+    candidate_rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidate_rows, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return np.take_along_axis(candidate_rows, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class ExactVectorIndex(InProcessVectorIndex):
+    """Brute-force exact search over a contiguous normalized float32 matrix.
+
+    A query is one matrix-vector product (a batch is one matrix-matrix
+    product) followed by an argpartition top-k, which beats graph indexes
+    and client round trips for catalogs of a few thousand items.
+    """
+
+    # Filtered queries scan every matching row, so they never miss results
+    exhaustive_search = True
+
+    def __init__(self, name: str, metadata: Optional[Dict] = None,
+                 embedding_function: Optional[Callable] = None):
+        super().__init__(name, metadata, embedding_function)
+        self._matrix = None
+
+    def _store_vectors(self, rows: np.ndarray, vectors: np.ndarray):
+        needed = int(rows.max()) + 1
+        if self._matrix is None or needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix) if self._matrix is not None else 0, 1024)
+            matrix = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            if self._matrix is not None:
+                matrix[:len(self._matrix)] = self._matrix
+            self._matrix = matrix
+        self._matrix[rows] = vectors
+
+    def _move_row(self, source: int, target: int):
+        self._matrix[target] = self._matrix[source]
+
+    def _truncate(self, count: int):
+        pass
+
+    def _row_vectors(self, rows: Sequence[int]) -> np.ndarray:
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[list(rows)].copy()
+
+    def _search(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray]):
+        matrix = self._matrix[:self.count()]
+        if len(queries) == 1:
+            scores = (matrix @ queries[0])[None, :]
+        else:
+            scores = queries @ matrix.T
+        if allowed is not None:
+            scores[:, ~allowed] = -np.inf
+        return top_k_rows(scores, k)
+
+
+class QuantizedVectorIndex(InProcessVectorIndex):
+    """Vector index holding int8 or float16 vectors in memory.
+
+    int8 uses symmetric per-vector scalar quantization (one float32 scale per
+    row). Queries scan the compact vectors for rescore_factor * n_results
+    candidates, then rescore them exactly against full-precision float32
+    vectors kept in a memory-mapped file on disk, so recall stays close to
+    float32 while resident memory is 1/4 (int8) or 1/2 (float16).
+    """
+
+    STORAGE_DTYPES = {'int8': np.int8, 'float16': np.float16}
+
+    # Filtered queries scan every matching row, so they never miss results
+    exhaustive_search = True
+
+    def __init__(self, name: str, metadata: Optional[Dict] = None,
+                 embedding_function: Optional[Callable] = None, storage: str = 'int8',
+                 rescore_factor: int = 4, storage_dir: Optional[str] = None):
+        super().__init__(name, metadata, embedding_function)
+        if storage not in self.STORAGE_DTYPES:
+            raise ValueError(f"Unsupported storage '{storage}', expected one of {sorted(self.STORAGE_DTYPES)}")
+        self.storage = storage
+        self.rescore_factor = max(1, rescore_factor)
+        self._dimension = None
+        self._capacity = 0
+        self._codes = None
+        self._scales = None
+        self._exact_file = tempfile.NamedTemporaryFile(prefix=f"{name}_", suffix=".f32", dir=storage_dir)
+        self._exact = None
+
+    def _ensure_capacity(self, rows_needed: int, dimension: int):
+        if self._dimension is None:
+            self._dimension = dimension
+        if rows_needed <= self._capacity:
+            return
+        capacity = max(rows_needed, self._capacity * 2, 1024)
+        codes = np.zeros((capacity, self._dimension), dtype=self.STORAGE_DTYPES[self.storage])
+        scales = np.ones(capacity, dtype=np.float32)
+        if self._codes is not None:
+            codes[:self._capacity] = self._codes
+            scales[:self._capacity] = self._scales
+        self._codes, self._scales, self._capacity = codes, scales, capacity
+
+        self._exact_file.truncate(capacity * self._dimension * 4)
+        # Map the open file object: reopening a NamedTemporaryFile by name fails on Windows
+        self._exact = np.memmap(self._exact_file, dtype=np.float32, mode='r+',
+                                shape=(capacity, self._dimension))
+
+    def _store_vectors(self, rows: np.ndarray, vectors: np.ndarray):
+        self._ensure_capacity(int(rows.max()) + 1, vectors.shape[1])
+        if self.storage == 'int8':
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._codes[rows] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            self._codes[rows] = vectors.astype(np.float16)
+        self._exact[rows] = vectors
+
+    def _move_row(self, source: int, target: int):
+        self._codes[target] = self._codes[source]
+        self._scales[target] = self._scales[source]
+        self._exact[target] = self._exact[source]
+
+    def _truncate(self, count: int):
+        pass
+
+    def _row_vectors(self, rows: Sequence[int]) -> np.ndarray:
+        if self._exact is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray(self._exact[list(rows)], dtype=np.float32)
+
+    def _approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """Dot products against the compact vectors, dequantized block by block"""
+        count = self.count()
+        scores = np.empty((len(queries), count), dtype=np.float32)
+        for start in range(0, count, SCORING_BLOCK_ROWS):
+            end = min(start + SCORING_BLOCK_ROWS, count)
+            block = self._codes[start:end].astype(np.float32)
+            scores[:, start:end] = queries @ block.T
+            if self.storage == 'int8':
+                scores[:, start:end] *= self._scales[start:end]
+        return scores
+
+    def _search(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray]):
+        scores = self._approximate_scores(queries)
+        if allowed is not None:
+            scores[:, ~allowed] = -np.inf
+            available = int(allowed.sum())
+        else:
+            available = self.count()
+
+        candidates, _ = top_k_rows(scores, min(available, k * self.rescore_factor))
+
+        # Exact float32 rescoring of the candidates from the memory-mapped file
+        exact_scores = np.einsum('qkd,qd->qk', self._exact[candidates.ravel()].reshape(
+            candidates.shape + (self._dimension,)), queries)
+        order = np.argsort(-exact_scores, axis=1)[:, :k]
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(exact_scores, order, axis=1)
+
+    def memory_bytes(self) -> int:
+        """Resident bytes used by the compact vectors (excluding the on-disk float32 copy)"""
+        count = self.count()
+        if self._dimension is None:
+            return 0
+        per_row = self._dimension * np.dtype(self.STORAGE_DTYPES[self.storage]).itemsize
+        if self.storage == 'int8':
+            per_row += 4
+        return count * per_row
+
+
+# 8-bit PQ codebooks have 256 centroids; FAISS wants 39 training vectors per centroid
+PQ_MIN_TRAINING_VECTORS = 39 * 256
+
+
+def _pq_subquantizers(dimension: int) -> int:
+    """Largest common PQ sub-quantizer count that divides the dimension"""
+    for m in (48, 32, 24, 16, 12, 8, 4, 2):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+class FaissVectorIndex(InProcessVectorIndex):
+    """Vector index backed by FAISS, with Flat, IVF-PQ or HNSW index types.
+
+    Each stored vector gets a stable int64 FAISS label; metadata filters are
+    applied as an IDSelectorBatch of the matching labels, so FAISS only
+    scores allowed items. IVF-PQ holds vectors in an exact flat index until
+    ivf_train_size items exist, then trains and moves them into the
+    compressed index; with expected_size the list count and training set
+    are sized for the final catalog rather than the first batch. HNSW cannot remove vectors, so deleted labels are
+    excluded by an IDSelectorNot over the tombstoned labels until they
+    outnumber live ones and the graph is rebuilt.
+    """
+
+    INDEX_TYPES = ('flat', 'ivfpq', 'hnsw')
+
+    def __init__(self, name: str, metadata: Optional[Dict] = None,
+                 embedding_function: Optional[Callable] = None, index_type: str = 'hnsw',
+                 hnsw_m: int = 32, ef_construction: int = 64, ef_search: int = 64,
+                 nprobe: int = 8, ivf_train_size: int = PQ_MIN_TRAINING_VECTORS, expected_size: Optional[int] = None):
+        super().__init__(name, metadata, embedding_function)
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Unsupported FAISS index type '{index_type}', expected one of {self.INDEX_TYPES}")
+        import faiss
+        self._faiss = faiss
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        # About 4 * sqrt(n) inverted lists, trained on at least 39 vectors each
+        self.nlist = max(1, int(4 * np.sqrt(expected_size))) if expected_size else None
+        if expected_size:
+            ivf_train_size = max(ivf_train_size, min(39 * self.nlist, expected_size))
+        # Smaller catalogs stay in the exact flat index rather than train degenerate codebooks
+        self.ivf_train_size = max(ivf_train_size, PQ_MIN_TRAINING_VECTORS)
+        self._index = None
+        self._trained_ivf = False
+        self._labels = np.zeros(0, dtype=np.int64)
+        self._row_of_label: Dict[int, int] = {}
+        self._stored_rows = 0
+        self._next_label = 0
+        self._tombstones: List[int] = []
+        self._tombstone_selector = None
+
+    @property
+    def exhaustive_search(self) -> bool:
+        # Flat indexes (and IVF-PQ before training) scan every allowed vector
+        return self.index_type == 'flat' or (self.index_type == 'ivfpq' and not self._trained_ivf)
+
+    def _new_index(self, dimension: int):
+        faiss = self._faiss
+        if self.index_type == 'hnsw':
+            graph = faiss.IndexHNSWFlat(dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            graph.hnsw.efConstruction = self.ef_construction
+            return faiss.IndexIDMap2(graph)
+        # Flat, and IVF-PQ until it has enough vectors to train
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+
+    def _train_ivfpq(self):
+        """Train IVF-PQ on the staged vectors and move them into it"""
+        faiss = self._faiss
+        staged = faiss.downcast_index(self._index.index)
+        vectors = staged.reconstruct_n(0, staged.ntotal)
+        labels = faiss.vector_to_array(self._index.id_map).astype(np.int64)
+
+        dimension = vectors.shape[1]
+        nlist = self.nlist or int(4 * np.sqrt(len(vectors)))
+        nlist = max(1, min(nlist, len(vectors) // 39))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, _pq_subquantizers(dimension), 8,
+                                 faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        # A hashtable direct map supports remove_ids and reconstruct with arbitrary labels
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        index.add_with_ids(vectors, labels)
+        self._quantizer = quantizer
+        self._index = index
+        self._trained_ivf = True
+        print(f"Trained IVF-PQ index '{self.name}' on {len(vectors)} vectors (nlist={nlist})")
+
+    def _remove_labels(self, labels: List[int]):
+        if not labels:
+            return
+        if self.index_type == 'hnsw':
+            self._tombstones.extend(labels)
+            self._tombstone_selector = None
+            return
+        labels = np.asarray(labels, dtype=np.int64)
+        if self._trained_ivf:
+            # The hashtable direct map only removes ids listed in an IDSelectorArray
+            selector = self._faiss.IDSelectorArray(len(labels), self._faiss.swig_ptr(labels))
+        else:
+            selector = self._faiss.IDSelectorBatch(len(labels), self._faiss.swig_ptr(labels))
+        self._index.remove_ids(selector)
+
+    def _rebuild_hnsw(self):
+        """Rebuild the HNSW graph from live vectors once deletions outnumber them"""
+        count = self.count()
+        labels = self._labels[:count].copy()
+        vectors = self._row_vectors(range(count))
+        self._index = self._new_index(self._index.d)
+        if count:
+            self._index.add_with_ids(vectors, labels)
+        self._tombstones = []
+        self._tombstone_selector = None
+
+    def _store_vectors(self, rows: np.ndarray, vectors: np.ndarray):
+        if self._index is None:
+            self._index = self._new_index(vectors.shape[1])
+        if len(self._labels) <= int(rows.max()):
+            grown = np.zeros(max(int(rows.max()) + 1, len(self._labels) * 2, 1024), dtype=np.int64)
+            grown[:len(self._labels)] = self._labels
+            self._labels = grown
+
+        # Overwritten rows get fresh labels; their old vectors are removed
+        replaced = [int(self._labels[row]) for row in rows if row < self._stored_rows]
+        for label in replaced:
+            self._row_of_label.pop(label, None)
+        self._remove_labels(replaced)
+
+        labels = np.arange(self._next_label, self._next_label + len(rows), dtype=np.int64)
+        self._next_label += len(rows)
+        self._labels[rows] = labels
+        for row, label in zip(rows, labels):
+            self._row_of_label[int(label)] = int(row)
+        self._stored_rows = max(self._stored_rows, int(rows.max()) + 1)
+        self._index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), labels)
+
+        if self.index_type == 'ivfpq' and not self._trained_ivf and self._index.ntotal >= self.ivf_train_size:
+            self._train_ivfpq()
+        if len(self._tombstones) > self.count():
+            self._rebuild_hnsw()
+
+    def _remove_row(self, row: int):
+        label = int(self._labels[row])
+        self._row_of_label.pop(label, None)
+        self._remove_labels([label])
+
+    def _move_row(self, source: int, target: int):
+        label = int(self._labels[source])
+        self._labels[target] = label
+        self._row_of_label[label] = target
+
+    def _truncate(self, count: int):
+        self._stored_rows = count
+        if len(self._tombstones) > count:
+            self._rebuild_hnsw()
+
+    def _row_vectors(self, rows: Sequence[int]) -> np.ndarray:
+        rows = list(rows)
+        if not rows:
+            return np.empty((0, self._index.d if self._index is not None else 0), dtype=np.float32)
+        return self._index.reconstruct_batch(np.ascontiguousarray(self._labels[rows]))
+
+    def _search_parameters(self, k: int, selector):
+        faiss = self._faiss
+        if self.index_type == 'hnsw':
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = max(self.ef_search, k)
+        elif self._trained_ivf:
+            params = faiss.SearchParametersIVF()
+            params.nprobe = self.nprobe
+        else:
+            params = faiss.SearchParameters()
+        if selector is not None:
+            params.sel = selector
+        return params
+
+    def _tombstone_filter(self):
+        """Selector excluding deleted HNSW labels, reused until the next delete"""
+        if self._tombstone_selector is None:
+            faiss = self._faiss
+            labels = np.asarray(self._tombstones, dtype=np.int64)
+            deleted = faiss.IDSelectorBatch(len(labels), faiss.swig_ptr(labels))
+            # IDSelectorNot does not own the wrapped selector, so both are kept
+            self._tombstone_selector = (deleted, faiss.IDSelectorNot(deleted))
+        return self._tombstone_selector[1]
+
+    def _search(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray]):
+        selector = None
+        if allowed is not None:
+            # ID-set prefilter: FAISS only considers labels of matching live rows
+            allowed_labels = np.ascontiguousarray(self._labels[:self.count()][allowed])
+            selector = self._faiss.IDSelectorBatch(len(allowed_labels), self._faiss.swig_ptr(allowed_labels))
+        elif self._tombstones:
+            selector = self._tombstone_filter()
+
+        similarities, labels = self._index.search(np.ascontiguousarray(queries, dtype=np.float32), k,
+                                                  params=self._search_parameters(k, selector))
+        rows = np.array([[self._row_of_label.get(int(label), -1) for label in query_labels]
+                         for query_labels in labels], dtype=np.int64)
+        return rows, similarities